@@ -1,20 +1,24 @@
 """Test the NLP knowledge extraction pipeline with Frankenstein text."""
 
-import os
-import sys
+from concurrent.futures import ThreadPoolExecutor
 
 
-from nlp.pipeline.KnowledgePipeline import KnowledgePipeline
+def read_text(path):
+    """Read a UTF-8 text file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
 
 
 def main():
     """Run the complete NLP pipeline on Frankenstein text."""
-    # Initialize pipeline
-    pipeline = KnowledgePipeline(enable_coref=True, coref_strategy='replace')
-    
+    # Load text from data/raw while spaCy and the pipeline are imported
     text_path = "data\\raw\\frankenstein.txt"
-    with open(text_path, 'r', encoding='utf-8') as f:
-        text = f.read()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        reader = pool.submit(read_text, text_path)
+
+        from nlp.pipeline.KnowledgePipeline import KnowledgePipeline
+        pipeline = KnowledgePipeline(enable_coref=True, coref_strategy='replace')
+        text = reader.result()
     
     print("=" * 60)
     print("NLP Knowledge Extraction Pipeline")
@@ -23,6 +27,8 @@ def main():
     db_path = "data\\databases\\db_frankenstein"
     html_path = "data\\visualizations\\frankenstein_knowledge_graph.html"
 
+    # Coreference needs the whole text: process_stream would only resolve pronouns against
+    # entities named in the same paragraph
     kb = pipeline.process_text(text, db_path, verbose=True)
     
     # Select the arcs that connect important vertices
@@ -1,10 +1,7 @@
 """Test the NLP knowledge extraction pipeline with Frankenstein text."""
 
-import os
-import sys
-
-
 from nlp.pipeline.KnowledgePipeline import KnowledgePipeline
+from nlp.preprocessing.TextCleaner import TextCleaner
 
 
 def main():
@@ -14,8 +11,6 @@ def main():
     
     # Load text from data/raw
     text_path = "data\\raw\\sampled_text.txt"
-    with open(text_path, 'r', encoding='utf-8') as f:
-        text = f.read()
     
     # Process text and build knowledge graph
     db_path = "data\\databases\\db_sampled_text"
@@ -24,7 +19,8 @@ def main():
     print("NLP Knowledge Extraction Pipeline")
     print("=" * 60)
     
-    kb = pipeline.process_text(text, db_path)
+    with open(text_path, 'r', encoding='utf-8') as f:
+        kb = pipeline.process_stream(TextCleaner.iter_paragraphs(f), db_path)
     
     # Visualize - save to data/visualizations
     html_path = "data\\visualizations\\sampled_text_knowledge_graph.html"
@@ -44,12 +44,13 @@ def example_srl_extractor():
         "Mary runs quickly."
     ]
     
-    for sentence in sentences:
-        result = extractor.extract_primitives(sentence)
+    # Parse all sentences in one nlp.pipe batch
+    for sentence, results in zip(sentences, extractor.extract_primitives_batch(sentences)):
         print(f"\nSentence: {sentence}")
-        print(f"  Subjects: {result['subjects']}")
-        print(f"  Verbs: {result['verbs']}")
-        print(f"  Objects: {result['objects']}")
+        for result in results:
+            print(f"  Subjects: {result['subjects']}")
+            print(f"  Verbs: {result['verbs']}")
+            print(f"  Objects: {result['objects']}")
 
 
 def example_full_pipeline():
@@ -1,32 +1,44 @@
-import os
-import sys
+"""Visualize an existing knowledge database, optionally filtered to arcs around given names."""
 
+import argparse
 
 from nlp.pipeline.KnowledgePipeline import KnowledgePipeline
 
+
+DEFAULT_NAMES = ('elizabeth', 'victor', 'frankenstein', 'creature', 'mother', 'father')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="data/databases/db_frankenstein",
+                        help="Knowledge database path without the .s3db extension")
+    parser.add_argument("--output", default="data/visualizations/frankenstein_knowledge_graph_query_filtered.html",
+                        help="HTML file to write")
+    parser.add_argument("--names", nargs="*", default=list(DEFAULT_NAMES),
+                        help="Only keep arcs touching these vertices (pass no names to keep all arcs)")
+    return parser.parse_args()
+
+
 def main():
     """Run the visualization from the existing knowledge database."""
+    args = parse_args()
+
     # Initialize pipeline
     pipeline = KnowledgePipeline()
-    
-    db_path = "data\\databases\\db_frankenstein"
-    html_path = "data\\visualizations\\frankenstein_knowledge_graph_query_filtered.html"
-
-    # Example arc_query to filter specific arcs (Filter arcs connected to important vertices)
-    arc_query = """
-        SELECT id
-        FROM arcs
-        WHERE start IN (
-            SELECT id FROM vertices 
-            WHERE name IN ('elizabeth', 'victor', 'frankenstein', 'creature', 'mother', 'father')
-        )
-        OR end IN (
-            SELECT id FROM vertices 
-            WHERE name IN ('elizabeth', 'victor', 'frankenstein', 'creature', 'mother', 'father')
-        )
-    """
-
-    pipeline.visualize(db_name=db_path, output_file=html_path, arc_query=arc_query) 
+
+    # Filter arcs connected to important vertices
+    arc_query = None
+    if args.names:
+        names = tuple(args.names)
+        placeholders = ",".join("?" * len(names))
+        arc_query = (f"""
+            SELECT id
+            FROM arcs
+            WHERE start IN (SELECT id FROM vertices WHERE name IN ({placeholders}))
+            OR end IN (SELECT id FROM vertices WHERE name IN ({placeholders}))
+        """, names + names)
+
+    pipeline.visualize(db_name=args.db, output_file=args.output, arc_query=arc_query)
     
     print("=" * 60)
     print("Visualization completed successfully!")
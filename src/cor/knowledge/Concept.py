@@ -4,19 +4,73 @@
 
 from cor.metagraph.MetaGraph import Vertex
 
+from functools import lru_cache
 import hashlib
+import struct
+import sys
+
+try:
+	import xxhash
+except ImportError:
+	xxhash = None
+
+_UNPACK_U32	= struct.Struct('>I').unpack_from
+
+def _sha256_id(name):
+	return _UNPACK_U32(hashlib.sha256(name.encode('utf-8')).digest())[0]
+
+def _blake2b_id(name):
+	return _UNPACK_U32(hashlib.blake2b(name.encode('utf-8'), digest_size=4).digest())[0]
+
+def _xxh3_id(name):
+	return xxhash.xxh3_64_intdigest(name.encode('utf-8')) & 0xFFFFFFFF
+
+# Concept ids are persisted in the vertices table, so every hash that was ever used stays
+# available under its version. Version 0 is the original SHA-256 id and is assumed for
+# knowledge bases that do not record a version.
+# Version 2 (xxh3) needs the optional xxhash package and is only used when asked for.
+HASHES	= { 0: _sha256_id, 1: _blake2b_id, 2: _xxh3_id }
+
+# Version recorded by new knowledge bases
+HASH_VERSION	= 1
+
+_HASH_CACHE		= {}
+
+def hash_function(version):
+	""" Returns the cached concept id function for a hash version
+	Arguments
+		version -- Hash version recorded by a knowledge base
+	"""
+	fn	= _HASH_CACHE.get(version)
+	if fn is None:
+		if version not in HASHES:
+			raise ValueError(f'Unknown concept hash version {version}.')
+		if HASHES[version] is _xxh3_id and xxhash is None:
+			raise ImportError(f'Concept hash version {version} requires the xxhash package.')
+
+		fn	= _HASH_CACHE[version] = lru_cache(maxsize=1_000_000)(HASHES[version])
+	return fn
+
+_to_id_cached	= hash_function(HASH_VERSION)
 
 class Concept(Vertex):
+	__slots__		= ()
+	HASH_VERSION	= HASH_VERSION
+
 	def __init__(self, name="", id=-1, weight=1.0, guid=None):
 		if id == -1 and name != "":
 			id = Concept.to_id(name)
+
+		# Names repeat across many concepts, share one string per name
+		if isinstance(name, str):
+			name = sys.intern(name)
 			
 		Vertex.__init__(self, id, weight, name, guid)
 		return
 
 	@staticmethod
 	def clone(v):
-		return Concept(v.id, v.weight, v.name, v.guid)
+		return Concept(v.name, v.id, v.weight, v.guid)
 
 	def OF(self):
 		pass
@@ -53,7 +107,8 @@ class Concept(Vertex):
 
 	@staticmethod
 	def to_id(name):
-		return int.from_bytes(hashlib.sha256(name.encode('utf-8')).digest()[:4])
+		return _to_id_cached(name)
+
 		
 if __name__ == "__main__":
 	test = Concept('xxx')
@@ -6,10 +6,13 @@ from cor.knowledge.Concept import Concept
 from cor.metagraph.MetaGraph import MetaGraph, Vertex, Arc
 from core.utilities.Errors import ErrorCode
 
+import io
+
 class PrintCtxt:
 	def __init__(self):
-		self.lines	= []
+		self.buf	= io.StringIO()
 		self.indent	= 0
+		self._pad	= [' ']		# Indentation prefix per level
 		return
 	
 
@@ -27,10 +30,16 @@ class Conception(MetaGraph):
 	def remove(self, vertex):
 		if self.root is not None and vertex.id == self.root.id:
 			MetaGraph.remove(self, vertex)
-			self.root = list(self.vertices.values())[0] if len(self.vertices) > 0 else None
+			self.root = next(iter(self.vertices.values()), None)
 		else:
 			MetaGraph.remove(self, vertex)
 
+	def filter(self, matches:set):
+		MetaGraph.filter(self, matches)
+		if self.root is not None and self.root.id not in matches:
+			self.root = next(iter(self.vertices.values()), None)
+		return self
+
 	def new_vertex(self, id=-1, weight=1.0, name="", guid=None):
 		return Concept(name, id, weight,  guid)
 
@@ -81,21 +90,17 @@ class Conception(MetaGraph):
 		return self
 
 	def intersection_update(self, rhs:MetaGraph):
-		rhsset	= rhs.to_set()
-		lhsset	= self.to_set()
-		result	= lhsset.intersection( rhsset )
-		return self.filter(result)
+		# filter() only considers our own vertices, so the ids of 'rhs' suffice
+		return self.filter( rhs.to_set() )
 
 	def difference_update(self, rhs):
-		rhsset	= rhs.to_set()
-		lhsset	= self.to_set()
-		result	= lhsset.difference( rhsset )
+		result	= self.to_set()
+		result.difference_update( rhs.iter_ids() )
 		return self.filter(result)
 
 	def symmetric_difference_update(self, rhs):
-		rhsset	= rhs.to_set()
-		lhsset	= self.to_set()
-		result	= lhsset.symmetric_difference( rhsset )
+		result	= self.to_set()
+		result.symmetric_difference_update( rhs.iter_ids() )
 
 		# Need top copy to incorporate all vertices and arcs from 'rhset'
 		rhs.copy_to( self )
@@ -136,21 +141,32 @@ class Conception(MetaGraph):
 				Conception.__print_preprocess,
 				Conception.__print_postprocess )
 		
-		return '\n'.join(ctxt.lines)
+		return ctxt.buf.getvalue()
 	
 	@staticmethod
 	def __print_preprocess(node:Concept, ctxt:PrintCtxt, level:int):
 		ctxt.indent	+= 1
+		ctxt._pad.append( ' ' * (ctxt.indent + 1) )
 		return ErrorCode.ERROR_CONTINUE
 
 	@staticmethod
 	def __print_postprocess(node:Concept, ctxt:PrintCtxt, level:int):
 		ctxt.indent	-= 1
+		ctxt._pad.pop()
 		return ErrorCode.ERROR_CONTINUE
 
 	@staticmethod
 	def __print_node(node:Concept, ctxt:PrintCtxt, level:int):
-		ctxt.lines.append( f'{" " * ctxt.indent} {ctxt.indent}-Node: {node.name} (id={node.id})' )
+		buf	= ctxt.buf
+		if buf.tell() > 0:
+			buf.write( '\n' )
+		buf.write( ctxt._pad[-1] )
+		buf.write( str(ctxt.indent) )
+		buf.write( '-Node: ' )
+		buf.write( node.name )
+		buf.write( ' (id=' )
+		buf.write( str(node.id) )
+		buf.write( ')' )
 		return ErrorCode.ERROR_CONTINUE
 
 
@@ -3,35 +3,108 @@
 # Description: Implementation of the Knowledge class
 
 from cor.knowledge.Conception import Conception
-from cor.knowledge.Concept import Concept
+from cor.knowledge.Concept import Concept, HASH_VERSION, hash_function
 from cor.knowledge.Language import Language
 from cor.metagraph.MetaGraphDatabase import MetaGraphDatabase
 
-import os, shutil
+from contextlib import contextmanager
+import os, shutil, sqlite3
 
 class Knowledge:
-	def __init__(self, name, template=None):
-		self.__create_database(name, template)
+	def __init__(self, name, template=None, hash_version=None):
+		""" Opens the knowledge base in '<name>.s3db', copying the template when it does not exist
+		Arguments
+			name -- Name of the knowledge base and its database file
+			template=None -- Database file to start from, defaults to Knowledge.template()
+			hash_version=None -- Concept hash version (see Concept.HASHES) of a new knowledge base,
+				defaults to HASH_VERSION. An existing one keeps the version it records and raises
+				ValueError when it differs
+		"""
+		self.__create_database(name, template, hash_version)
 		self.language	= None
 		return
 
-	def __create_database(self, name, template):
+	def __create_database(self, name, template, hash_version):
+		version	= HASH_VERSION if hash_version is None else hash_version
+		hash_function(version)	# Fails before anything records a hash that is not available
+
 		path =	f'{name}.s3db'
-		if os.path.exists(path):
-			self.graph	= MetaGraphDatabase(path)
-			self.graph.create(name,1)
-			return
-		
-		template	= Knowledge.__find_template(template)
-		if template is None:
-			raise FileNotFoundError(f'Database file {path} does not exist.')
-		
-		shutil.copy(template, path)
+		created	= not os.path.exists(path)
+		if created:
+			template	= Knowledge.__find_template(template)
+			if template is None:
+				raise FileNotFoundError(f'Database file {path} does not exist.')
+			
+			shutil.copy(template, path)
 		
 		self.graph	= MetaGraphDatabase(path)
-		self.graph.create(name,1)
+
+		# WAL persists in the file, so only databases created here are switched to it; existing
+		# files keep the journal mode their owner chose
+		if created:
+			self.graph.execute_sql('PRAGMA journal_mode=WAL')
+		if self.graph.conn.connect().execute('PRAGMA journal_mode').fetchone()[0] == 'wal':
+			self.graph.execute_sql('PRAGMA synchronous=NORMAL')
+		self.graph.execute_sql('CREATE INDEX IF NOT EXISTS idx_vertices_name ON vertices(name)')
+		self.graph.execute_sql('CREATE INDEX IF NOT EXISTS idx_arcs_start ON arcs(start)')
+		self.graph.execute_sql('CREATE INDEX IF NOT EXISTS idx_arcs_end ON arcs(end)')
+		self.graph.create(name, 1, metadata=f'hash={version}')
+
+		self.hash_version	= Knowledge.__hash_version(self.graph)
+		if hash_version is not None and hash_version != self.hash_version:
+			raise ValueError(f'Database file {path} uses concept hash version {self.hash_version}, not {hash_version}. '
+							 'Its vertex types must be recomputed to migrate it.')
+		self.to_id			= hash_function(self.hash_version)		# Ids this database stores
+		return
+
+	@staticmethod
+	def __hash_version(graph):
+		""" Returns the concept hash version recorded for the graph. Graphs created before
+			the version was recorded hold SHA-256 ids (version 0); opening one leaves it as is
+		"""
+		metadata	= graph['graphs'].get(graph.id, 'metadata') or ''
+		if metadata.startswith('hash='):
+			return int(metadata[len('hash='):])
+
+		return 0
+
+	def begin_batch(self):
+		""" Starts a transaction grouping all subsequent writes until commit_batch
+		"""
+		self.graph.conn.begin_batch()
+		return
+
+	def commit_batch(self):
+		""" Commits the writes made since begin_batch, or rolls them back when a nested
+			batch was rolled back
+		"""
+		rolled_back	= self.graph.conn.connect().rollback_only
+		if self.graph.conn.commit_batch() == 0 and rolled_back:
+			self.speak().forget()
 		return
 
+	def rollback_batch(self):
+		""" Discards the writes made since begin_batch
+		"""
+		self.graph.conn.rollback_batch()
+
+		# Vertices created inside the batch no longer exist
+		self.speak().forget()
+		return
+
+	@contextmanager
+	def batch(self):
+		""" Context manager wrapping a block of writes in a single transaction
+		"""
+		self.begin_batch()
+		try:
+			yield self
+		except BaseException:
+			self.rollback_batch()
+			raise
+		else:
+			self.commit_batch()
+
 	@staticmethod
 	def template():		
 		cordir	= os.environ.get('COR_DIR')
@@ -59,7 +132,7 @@ class Knowledge:
 	
 	def speak(self):
 		if self.language is None:
-			self.language = Language(self.graph)
+			self.language = Language(self.graph, self.to_id)
 
 		return self.language
 
@@ -74,28 +147,38 @@ class Knowledge:
 		t   	= (self.graph.id,)
 
 		# Get vertices
-		c		= conn.cursor()
+		c		= Knowledge.__bulk_cursor(conn)
 		c.execute('SELECT id, name, value, guid, clsid, objid FROM vertices WHERE graph_id=?', t)
-		for row in c:
-			v = Concept( row[1], row[0], row[2], row[3] )
-			concept.add( v )
-			if concept.root is None:
-				concept.root = v
+		for rows in iter(c.fetchmany, []):
+			for row in rows:
+				v = Concept( row['name'], row['id'], row['value'], row['guid'] )
+				concept.add( v )
+				if concept.root is None:
+					concept.root = v
 		c.close()
 
 		# Get arcs
-		c		= conn.cursor()
+		c		= Knowledge.__bulk_cursor(conn)
 		c.execute('SELECT id, name, weight, guid, start, end, anchor FROM arcs WHERE graph_id=?', t)
-		for row in c:
-			a = concept.join( row[4], row[5], row[2], row[6], row[0] )
+		for rows in iter(c.fetchmany, []):
+			for row in rows:
+				concept.join( row['start'], row['end'], row['weight'], row['anchor'], row['id'] )
 		c.close()
 
 		return concept
+
+	@staticmethod
+	def __bulk_cursor(conn):
+		# Row factory is set on the cursor only, the connection is shared by all tables
+		c				= conn.cursor()
+		c.row_factory	= sqlite3.Row
+		c.arraysize		= 10_000
+		return c
 	
 	def __getitem__(self, name):
 		v = self.graph.get_vertex_by_name(name, auto_add=False)
 		if v is None:
-			v = self.graph.add_vertex(name, Concept.to_id(name))
+			v = self.graph.add_vertex(name, self.to_id(name))
 
 		return v
 
@@ -106,57 +189,33 @@ class Knowledge:
 		if v is None:
 			raise ValueError(f'Concept {name} not found in knowledge base.')
 
-		links 			= {}
-		concept.root 	= self.__traverse_subgraph( concept, v, depth, links)
-
-		self.__link_nodes(concept, links)
+		# Collect vertices within 'depth' hops and their outgoing arcs in a single query
+		rows	= self.graph.get_subgraph(v.id, depth)
+
+		concepts = {}
+		for row in rows:
+			if row[0] not in concepts:
+				node = Concept( row[1], row[0], row[2], row[3] )
+				concepts[row[0]] = node
+				concept.add( node )
+
+		concept.root	= concepts[v.id]
+
+		for row in rows:
+			end = concepts.get(row[8], None)
+			if end is None:
+				continue
+
+			concept.join(
+				row[1],
+				end.name,
+				row[6],
+				row[5],
+				row[9] or None,
+				row[7],
+				row[4])
 		return
 
-	def __link_nodes(self, concept, links):
-		for start, arcs in links.items():
-			for aid in arcs:
-				a 		= self.graph.get_arc(aid)
-				
-				concept.join(
-					start, 
-					a['end'], 
-					a['weight'], 
-					a['name'], 
-					a.anchor,
-					a.id)
-		return
-
-	def __traverse_subgraph(self, concept, v, depth:int, links):
-		c = Concept.clone(v)
-		if depth < 0:
-			return c
-
-		# If the concept already exists in the conception, return it
-		if concept.add(c) is False:
-			return c
-		
-		# Clone the arcs
-		arcs 		= self.graph.get_arcs_for_vertex( v.id )
-		links[v.id] = arcs
-
-		for aid in arcs:
-			a 		= self.graph.get_arc(aid)
-			anchor 	= self.__create_node(concept, a['anchor'], depth - 1, links)
-			start  	= self.__create_node(concept, a['start'], depth - 1, links)
-			end    	= self.__create_node(concept, a['end'], depth - 1, links)
-
-		return c
-
-	def __create_node(self, concept, v, depth:int, links):
-			if v == 0:
-				return None
-			
-			return self.__traverse_subgraph(
-				concept,
-				self.graph.get_vertex(v), 
-				depth,
-				links )
-
 if __name__ == "__main__":
 	test = Knowledge()
 
@@ -5,8 +5,11 @@
 from cor.metagraph.MetaGraphDatabase import MetaGraphDatabase
 from cor.knowledge.Concept import Concept
 
+from collections import OrderedDict
 from enum import Enum
+from functools import lru_cache
 from typing import Any
+import sys
 
 class Atomic(Enum):
 	OF		= 1
@@ -20,10 +23,30 @@ class Atomic(Enum):
 	IS		= 9
 	
 
+# Relation names are interned once and shared by every link
+_ATOMIC_NAMES	= {a: sys.intern(a.name) for a in Atomic}
+
+@lru_cache(maxsize=4096)
+def _compose_str(base, metadata):
+	return sys.intern(f'{base}.{metadata}')
+
+def _compose(base, metadata):
+	# Only string metadata is cached, other values may not be hashable
+	if isinstance(metadata, str):
+		return _compose_str(base, metadata)
+	return f'{base}.{metadata}'
+
 
 class Language:
-	def __init__(self, graph:MetaGraphDatabase):
+	def __init__(self, graph:MetaGraphDatabase, to_id=Concept.to_id, cache_size=100_000):
 		self.graph = graph
+		self.to_id = to_id		# Concept id hash of the graph's knowledge base
+
+		# Name to vertex cache, least recently used first. It only sees writes made through
+		# this Language; after changes through another Knowledge or MetaGraphDatabase on the
+		# same file, call forget()
+		self.nodes		= OrderedDict()
+		self.cache_size	= cache_size
 		return
 
 	def OF(self, a, A, B):
@@ -55,7 +78,7 @@ class Language:
 		return
 
 	def RELATES(self, A, B, c, by):
-		link 	= self.link(A, B, Atomic.RELATES)
+		self.link(A, B, Atomic.RELATES)
 		return
 
 	def OF(self, B, A):
@@ -74,7 +97,9 @@ class Language:
 		a_node	= self.get_node(a)
 		b_node	= self.get_node(b)
 
-		ln_name	= relation.name if metadata is None else f'{relation.name}.{metadata}'
+		ln_name	= _ATOMIC_NAMES[relation]
+		if metadata is not None:
+			ln_name	= _compose(ln_name, metadata)
 		edge 	= self.graph.join(a_node.id, b_node.id, relation.value, None, ln_name)
 
 		if metadata is not None:
@@ -84,12 +109,33 @@ class Language:
 
 
 	def get_node(self, name):
+		if isinstance(name, str):
+			name = sys.intern(name)
+
+		nodes	= self.nodes
+		v		= nodes.get(name, None)
+		if v is not None:
+			nodes.move_to_end(name)
+			return v
+
 		v = self.graph.get_vertex_by_name(name, auto_add=False)
 		if v is None:
-			v = self.graph.add_vertex(name, Concept.to_id(name))
+			v = self.graph.add_vertex(name, self.to_id(name))
 		
+		nodes[name] = v
+		if len(nodes) > self.cache_size:
+			nodes.popitem(last=False)
 		return v
 
+	def forget(self, name=None):
+		""" Drops a cached vertex, or the whole cache when no name is given
+		"""
+		if name is None:
+			self.nodes.clear()
+		else:
+			self.nodes.pop(name, None)
+		return
+
 if __name__ == "__main__":
 	test = Language()
 
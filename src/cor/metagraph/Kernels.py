@@ -0,0 +1,93 @@
+#!/usr/bin/python
+# Filename: Kernels.py
+# Description: Traversal kernels over the CSR arrays of a MetaGraph, compiled with numba when it is installed
+
+import numpy as np
+
+try:
+	from numba import njit
+except ImportError:
+	def njit(*args, **kwargs):
+		if len(args) == 1 and callable(args[0]):
+			return args[0]
+		return lambda fn: fn
+
+@njit(cache=True)
+def bfs_csr(indptr, indices, source, maxlevel, visited, order):
+	""" Breadth first order of the rows reachable from a source row
+	Arguments
+		indptr, indices -- CSR arrays from MetaGraph.to_csr
+		source -- Row to start from
+		maxlevel -- Maximum number of arcs to follow
+		visited -- uint8 mask over rows, set for every row reached
+		order -- int32 array receiving the rows in visiting order
+	Returns the number of rows written to order
+	"""
+	visited[source]	= 1
+	order[0]		= source
+	head			= 0
+	tail			= 1
+	level			= 0
+
+	while head < tail and level < maxlevel:
+		end = tail
+		while head < end:
+			v		= order[head]
+			head	+= 1
+			for k in range(indptr[v], indptr[v + 1]):
+				w = indices[k]
+				if w >= 0 and visited[w] == 0:
+					visited[w]	= 1
+					order[tail]	= w
+					tail		+= 1
+		level += 1
+
+	return tail
+
+@njit(cache=True)
+def dfs_csr(indptr, indices, source, maxlevel, visited, order):
+	""" Depth first (pre-)order of the rows reachable from a source row
+	Arguments
+		indptr, indices -- CSR arrays from MetaGraph.to_csr
+		source -- Row to start from
+		maxlevel -- Maximum number of arcs to follow
+		visited -- uint8 mask over rows, set for every row reached
+		order -- int32 array receiving the rows in visiting order
+	Returns the number of rows written to order
+	"""
+	visited[source]	= 1
+	order[0]		= source
+	count			= 1
+	if maxlevel <= 0:
+		return count
+
+	# Stack of rows being expanded and the position of their next arc
+	rows			= np.empty(len(indptr) - 1, dtype=np.int32)
+	positions		= np.empty(len(indptr) - 1, dtype=np.int32)
+	top				= 0
+	rows[0]			= source
+	positions[0]	= indptr[source]
+
+	while top >= 0:
+		v = rows[top]
+		k = positions[top]
+		if k == indptr[v + 1]:
+			top -= 1
+			continue
+
+		positions[top] = k + 1
+
+		w = indices[k]
+		if w < 0 or visited[w] != 0:
+			continue
+
+		visited[w]		= 1
+		order[count]	= w
+		count			+= 1
+
+		if top + 1 < maxlevel:
+			top				+= 1
+			rows[top]		= w
+			positions[top]	= indptr[w]
+
+	return count
@@ -3,32 +3,87 @@
 # Description: Active record design pattern for graph database access
 
 from core.utilities.Errors import ErrorCode
+from cor.metagraph.Kernels import bfs_csr, dfs_csr
 
+from collections import deque
+import itertools
+import numpy as np
+import os
 import uuid
 from datetime import datetime
 
+# Callback results that let a traversal carry on. Tuples of enum members are matched by
+# identity, cheaper than building a list per test or hashing members into a frozenset
+_PROCEED			= (ErrorCode.NOERROR, ErrorCode.ERROR_CONTINUE)
+_PROCEED_OR_DONE	= _PROCEED + (ErrorCode.ERROR_NO_MORE_ITEMS,)
+
+# Random GUIDs are drawn from the OS in blocks rather than one system call each. A forked
+# child must not hand out the block its parent already drew from
+_GUID_POOL	= []
+if hasattr(os, 'register_at_fork'):
+	os.register_at_fork(after_in_child=_GUID_POOL.clear)
+
+# Each traversal stamps the vertices it reaches with a fresh generation number instead of
+# hashing them into a visited set; callbacks must not start another traversal over them
+_GENERATION	= itertools.count(1)
+
+# Bumped whenever a vertex drops an arc on its own. Vertices do not know the graphs holding
+# them, so every graph compares it against the value its cached CSR arrays were built at
+_arc_changes	= 0
+
+def _new_guid():
+	if not _GUID_POOL:
+		buf = os.urandom(16 * 256)
+		_GUID_POOL.extend( uuid.UUID(bytes=buf[i:i+16], version=4) for i in range(0, len(buf), 16) )
+	return _GUID_POOL.pop()
+
 class Arc:
+	__slots__	= ('id', '_guid', 'name', 'weight', 'start', 'end', 'anchor')
+
 	def __init__(self, start, end, id=-1, weight=1.0, name="", anchor=None, guid=None):
 		self.id			= id
-		self.guid		= guid if guid is not None else uuid.uuid4()
+		self._guid		= guid		# Generated on first access when None
 		self.name		= name
 		self.weight		= weight
 		self.start		= start
 		self.end		= end
 		self.anchor		= anchor
 		return
+
+	@property
+	def guid(self):
+		if self._guid is None:
+			self._guid = _new_guid()
+		return self._guid
+
+	@guid.setter
+	def guid(self, value):
+		self._guid = value
 		
 
 class Vertex:
+	__slots__	= ('id', '_guid', 'name', 'weight', 'arcs', 'anchor', '_visited')
+
 	def __init__(self, id=-1, weight=1.0, name="", guid=None):
 		self.id			= id
-		self.guid		= guid if guid is not None else uuid.uuid4()
+		self._guid		= guid		# Generated on first access when None
 		self.name		= name
 		self.weight		= weight
 		self.arcs		= []
 		self.anchor		= None
+		self._visited	= 0			# Generation of the last traversal that reached it
 		return
 
+	@property
+	def guid(self):
+		if self._guid is None:
+			self._guid = _new_guid()
+		return self._guid
+
+	@guid.setter
+	def guid(self, value):
+		self._guid = value
+
 	def connected(self, b):
 		for arc in self.arcs:
 			if arc.end == b:
@@ -37,9 +92,11 @@ class Vertex:
 		return False
 	
 	def detach(self, b):
-		for arc in self.arcs:
+		global _arc_changes
+		for i, arc in enumerate(self.arcs):
 			if arc.end == b:
-				self.arcs.remove( arc )
+				del self.arcs[i]
+				_arc_changes += 1
 				return True
 			
 		return False
@@ -74,13 +131,13 @@ class Vertex:
 		if depth <= 0:
 			return ErrorCode.NOERROR
 		
-		visited = set()
-		visited.add( self )
+		visited = next( _GENERATION )
+		self._visited = visited
 
 		result	= self.visit( fn, ctxt, visitanchor, visited, depth, preproc, postproc, False )
 		
 		if result == ErrorCode.NOERROR or result == ErrorCode.ERROR_CONTINUE:
-			return self.traverse_bfs( fn, ctxt, depth-1, visitanchor, visited )
+			return self.traverse_bfs( fn, ctxt, depth-1, visitanchor, visited, preproc, postproc )
 		
 		return result
 
@@ -97,8 +154,8 @@ class Vertex:
 		if depth <= 0:
 			return ErrorCode.NOERROR
 		
-		visited = set()
-		visited.add( self )
+		visited = next( _GENERATION )
+		self._visited = visited
 
 		result	= self.visit( fn, ctxt, visitanchor, visited, depth, preproc, postproc, True )
 		
@@ -114,6 +171,7 @@ class Vertex:
 			fn -- Function to call back
 			ctxt -- Context argument passed to the function
 			maxlevel=1024 -- Maximum depth to recurse into
+			visited -- Generation number stamped on reached vertices
 			preproc -- Preprocessor callback
 			postproc -- Postprocessor callback
 		"""
@@ -122,51 +180,86 @@ class Vertex:
 		if maxlevel <= 0:
 			return result
 
-		# Traverse current level
-		for a in self.arcs:
-			if a.end in visited:
+		# Explicit stack of [level, arc iterator, level result, vertex being descended into]
+		# frames; ERROR_NO_MORE_ITEMS ends the current level only, other errors end the traversal
+		stack	= [[maxlevel, iter(self.arcs), result, None]]
+		done	= None			# Result of the level that just finished
+
+		while stack:
+			frame	= stack[-1]
+			level	= frame[0]
+
+			if done is not None:
+				result, done = done, None
+				if result not in _PROCEED:
+					return result
+				
+				frame[2] = result
+
+				if postproc is not None:
+					result	= postproc( frame[3], ctxt, level )
+					
+					if result == ErrorCode.ERROR_NO_MORE_ITEMS:
+						done = ErrorCode.ERROR_CONTINUE
+						stack.pop()
+						continue
+					
+					if result not in _PROCEED:
+						return result
+					
+					frame[2] = result
+
+			a = next( frame[1], None )
+			if a is None:
+				done = frame[2]
+				stack.pop()
 				continue
 
-			visited.add( a.end )
+			if a.end._visited == visited:
+				continue
+
+			a.end._visited = visited
 
 			if preproc is not None:
-				result	= preproc( a.end, ctxt, maxlevel )
+				result	= preproc( a.end, ctxt, level )
 
 				if result == ErrorCode.ERROR_NO_MORE_ITEMS:
-					return ErrorCode.ERROR_CONTINUE
+					done = ErrorCode.ERROR_CONTINUE
+					stack.pop()
+					continue
 
-				if result not in [ErrorCode.NOERROR, ErrorCode.ERROR_CONTINUE]:
+				if result not in _PROCEED:
 					return result
 				
-			result	= a.end.visit( fn, ctxt, visitanchor, visited, maxlevel, preproc, postproc, True )
+				frame[2] = result
+				
+			result	= a.end.visit( fn, ctxt, visitanchor, visited, level, preproc, postproc, True )
 
 			if result == ErrorCode.ERROR_NO_MORE_ITEMS:
-				return ErrorCode.ERROR_CONTINUE
+				done = ErrorCode.ERROR_CONTINUE
+				stack.pop()
+				continue
 			
-			if result not in [ErrorCode.NOERROR, ErrorCode.ERROR_CONTINUE]:
+			if result not in _PROCEED:
 				return result
 			
-			result 	= a.end.traverse_dfs( fn, ctxt , maxlevel-1, visitanchor, visited, preproc, postproc )
-			if result not in [ErrorCode.NOERROR, ErrorCode.ERROR_CONTINUE]:
-				return result
+			frame[2] = result
+			frame[3] = a.end
 
-			if postproc is not None:
-				result	= postproc( a.end, ctxt, maxlevel )
-				
-				if result == ErrorCode.ERROR_NO_MORE_ITEMS:
-					return ErrorCode.ERROR_CONTINUE
-				
-				if result not in [ErrorCode.NOERROR, ErrorCode.ERROR_CONTINUE]:
-					return result
+			if level > 1:
+				stack.append( [level-1, iter(a.end.arcs), ErrorCode.NOERROR, None] )
+			else:
+				done = ErrorCode.NOERROR
 
-		return result
+		return done
 
 	def traverse_bfs( self, fn, ctxt, maxlevel, visitanchor, visited, preproc, postproc ):
-		""" Helper function to iterate through vertices of a graph and invoke a callback
+		""" Helper function to iterate through vertices of a graph level by level and invoke a callback
 		Arguments
 			fn -- Function to call back
 			ctxt -- Context argument passed to the function
 			maxlevel=1024 -- Maximum depth to recurse into
+			visited -- Generation number stamped on reached vertices
 			preproc -- Preprocessor callback
 			postproc -- Postprocessor callback
 		"""
@@ -175,55 +268,54 @@ class Vertex:
 		if maxlevel <= 0:
 			return result
 
-		# Traverse current level
-		for a in self.arcs:
-			if a.end in visited:
-				continue
+		# ERROR_NO_MORE_ITEMS stops expanding the current vertex, other errors end the traversal
+		queue	= deque( [(self, maxlevel)] )
 
-			visited.add( a.end )
+		while queue:
+			v, level = queue.popleft()
 
-			if preproc is not None:
-				result	= preproc( a.end, ctxt, maxlevel )
-				
-				if result == ErrorCode.ERROR_NO_MORE_ITEMS:
-					return ErrorCode.ERROR_CONTINUE
-				
-				if result not in [ErrorCode.NOERROR, ErrorCode.ERROR_CONTINUE]:
-					return result
-				
-			result	= a.end.visit( fn, ctxt, visitanchor, visited, maxlevel, preproc, postproc, False )
-			
-			if result == ErrorCode.ERROR_NO_MORE_ITEMS:
-				return ErrorCode.ERROR_CONTINUE
-			
-			if result not in [ErrorCode.NOERROR, ErrorCode.ERROR_CONTINUE]:
-				return result
+			for a in v.arcs:
+				if a.end._visited == visited:
+					continue
 
-			if postproc is not None:
-				result	= postproc( a.end, ctxt, maxlevel )
+				a.end._visited = visited
+
+				if preproc is not None:
+					result	= preproc( a.end, ctxt, level )
+					
+					if result == ErrorCode.ERROR_NO_MORE_ITEMS:
+						result = ErrorCode.ERROR_CONTINUE
+						break
+					
+					if result not in _PROCEED:
+						return result
+					
+				result	= a.end.visit( fn, ctxt, visitanchor, visited, level, preproc, postproc, False )
 				
 				if result == ErrorCode.ERROR_NO_MORE_ITEMS:
-					return ErrorCode.ERROR_CONTINUE
+					result = ErrorCode.ERROR_CONTINUE
+					break
 				
-				if result not in [ErrorCode.NOERROR, ErrorCode.ERROR_CONTINUE]:
+				if result not in _PROCEED:
 					return result
 
-		if maxlevel <= 1:
-			return result
-		
-		# Recurse into next level
-		for a in self.arcs:
-			if a.end in visited:
-				continue
-
-			result 	= a.end.traverse_bfs( fn, ctxt , maxlevel-1, visitanchor, visited, preproc, postproc )
-			if result not in [ErrorCode.NOERROR, ErrorCode.ERROR_CONTINUE]:
-				return result
+				if postproc is not None:
+					result	= postproc( a.end, ctxt, level )
+					
+					if result == ErrorCode.ERROR_NO_MORE_ITEMS:
+						result = ErrorCode.ERROR_CONTINUE
+						break
+					
+					if result not in _PROCEED:
+						return result
+
+				if level > 1:
+					queue.append( (a.end, level-1) )
 			
 		return result
 
 	def visit(self, fn, ctxt, visitanchor, visited, maxlevel, preproc, postproc, isdfs=True ):
-		visited.add( self )
+		self._visited = visited
 		result	= fn( self, ctxt, maxlevel )
 
 		if result == ErrorCode.ERROR_NO_MORE_ITEMS:
@@ -233,11 +325,11 @@ class Vertex:
 		if visitanchor == False or self.anchor is None:
 			return result
 		
-		if result not in [ErrorCode.NOERROR, ErrorCode.ERROR_CONTINUE]:
+		if result not in _PROCEED:
 			return result
 
 		# Visit the anchor node		
-		visited.add( self.anchor )
+		self.anchor._visited = visited
 
 		if preproc is not None:
 			result	= preproc( self.anchor, ctxt, maxlevel )
@@ -245,12 +337,12 @@ class Vertex:
 			if result == ErrorCode.ERROR_NO_MORE_ITEMS:
 				return ErrorCode.ERROR_CONTINUE
 			
-			if result not in [ErrorCode.NOERROR, ErrorCode.ERROR_CONTINUE]:
+			if result not in _PROCEED:
 				return result
 
 		result	= fn( self.anchor, ctxt, maxlevel )
 		
-		if result not in [ErrorCode.NOERROR, ErrorCode.ERROR_CONTINUE, ErrorCode.ERROR_NO_MORE_ITEMS]:
+		if result not in _PROCEED_OR_DONE:
 			return result
 
 		if postproc is not None:
@@ -259,7 +351,7 @@ class Vertex:
 			if result == ErrorCode.ERROR_NO_MORE_ITEMS:
 				return ErrorCode.ERROR_CONTINUE
 			
-			if result not in [ErrorCode.NOERROR, ErrorCode.ERROR_CONTINUE]:
+			if result not in _PROCEED:
 				return result
 
 		if isdfs:
@@ -275,6 +367,10 @@ class Vertex:
 class MetaGraph:
 	def __init__(self):
 		self.vertices	= {}
+		self._by_id		= {}		# Vertex id to first added vertex with that id
+		self._csr		= None		# Cached to_csr() arrays, dropped on every change
+		self._csr_at	= 0			# Value of _arc_changes the cached arrays were built at
+		self._csr_rows	= None		# id() of each vertex to its row in the cached arrays
 		return
 	
 	def add(self, vertex):
@@ -282,28 +378,48 @@ class MetaGraph:
 			return False
 		
 		self.vertices[vertex.name] = vertex
+		self._by_id.setdefault(vertex.id, vertex)
+		self._csr = None
 		return True
 
 	def remove(self, vertex):
+		vid = vertex.id
 		for v in self.vertices.values():
-			if v.id == vertex.id:
+			if v.id == vid:
 				continue
 			
-			for a in list(v.arcs):
-				if (a.end.id == vertex.id) or (a.start.id == vertex.id):
-					v.arcs.remove( a )
+			# Rebuild the arc list in one pass, keeping the order of the remaining arcs
+			v.arcs[:] = [a for a in v.arcs if a.end.id != vid and a.start.id != vid]
 	
-		del self.vertices[vertex.name]
+		removed = self.vertices.pop(vertex.name)
+		if self._by_id.get(removed.id, None) is removed:
+			del self._by_id[removed.id]
+			for v in self.vertices.values():
+				if v.id == removed.id:
+					self._by_id[v.id] = v
+					break
+
+		self._csr = None
 		return
 
 	def filter(self, matches:set):
-		remove_list = []
+		""" Keeps only the vertices whose id is in matches, together with the arcs between them
+		"""
+		removed = [v for v in self.vertices.values() if v.id not in matches]
+		if not removed:
+			return self
+
+		ids = { v.id for v in removed }
+		for v in removed:
+			del self.vertices[v.name]
+			if self._by_id.get(v.id, None) is v:
+				del self._by_id[v.id]
+
+		# Single pass over the surviving arcs instead of one full scan per removed vertex
 		for v in self.vertices.values():
-			if v.id not in matches:
-				remove_list.append( v )
-		
-		for v in remove_list:
-			self.remove( v )
+			v.arcs[:] = [a for a in v.arcs if a.end.id not in ids and a.start.id not in ids]
+
+		self._csr = None
 		return self
 
 	def clone(self):
@@ -314,35 +430,64 @@ class MetaGraph:
 		for v in self.vertices.values():
 			copy.add( self.new_vertex(v.id, v.weight, v.name, v.guid) )
 		
-		# Clone arcs
+		# Clone arcs, resolving each start vertex once and handing join() the vertices
+		vertices = copy.vertices
 		for v in self.vertices.values():
+			start = vertices[v.name]
 			for a in v.arcs:
-				copy.join( a.start.name, a.end.name, a.weight, a.name, a.anchor, a.guid, a.id )
+				end = vertices.get(a.end.name, None)
+				if end is not None:
+					copy.join( start, end, a.weight, a.name, a.anchor, a.guid, a.id )
 		
 		return copy
 
 	def new_vertex(self, id=-1, weight=1.0, name="", guid=None):
 		return Vertex(id, weight, name, guid)
 	
-	def to_set(self):
-		result = set()
+	def reachable(self, name, depth=1024, dfs=False):
+		""" Returns the vertices reachable from a vertex in the order bfs/dfs would visit them,
+			without invoking callbacks or following vertex anchors
+		Arguments
+			name -- Name of the vertex to start from
+			depth=1024 -- Maximum depth, as for Vertex.bfs and Vertex.dfs
+			dfs=False -- Whether to use depth first instead of breadth first order
+		"""
+		start = self.vertices.get(name, None)
+		if start is None or depth <= 0:
+			return []
+
+		vertices, indptr, indices, weights = self.to_csr()
+		source	= self._csr_rows[id(start)]
+		visited	= np.zeros(len(vertices), dtype=np.uint8)
+		order	= np.empty(len(vertices), dtype=np.int32)
+
+		kernel	= dfs_csr if dfs else bfs_csr
+		count	= kernel(indptr, indices, source, depth - 1, visited, order)
+		return [vertices[i] for i in order[:count]]
+
+	def iter_ids(self):
 		for v in self.vertices.values():
-			result.add( v.id )
+			yield v.id
 
-		return result
+	def to_set(self):
+		return set( self.iter_ids() )
 
 	def join(self, a, b, weight=1.0, name="", anchor=None, guid=None, aid=-1):
-		a = self.get_vertex(a)
-		if a is None:
-			return None
+		# a and b are names or ids, or vertices of this graph
+		if not isinstance(a, Vertex):
+			a = self.get_vertex(a)
+			if a is None:
+				return None
 
-		b = self.get_vertex(b)
-		if b is None:
-			return None
+		if not isinstance(b, Vertex):
+			b = self.get_vertex(b)
+			if b is None:
+				return None
 
 
 		arc = Arc(a, b, aid, weight, name, anchor, guid)
 		a.arcs.append( arc )
+		self._csr = None
 		return arc
 
 	def detach(self, a, b):
@@ -350,7 +495,38 @@ class MetaGraph:
 		if v is None:
 			return False
 		
-		return v.detach(b)
+		if not v.detach(b):
+			return False
+
+		self._csr = None
+		return True
+
+	def to_csr(self):
+		""" Returns the arcs in compressed sparse row form as (vertices, indptr, indices, weights).
+			Row i holds the arcs of vertices[i] in indices[indptr[i]:indptr[i+1]], arcs ending
+			outside the graph have index -1. The arrays are cached until the graph is modified
+			through its methods or Vertex.detach and must not be written to. Arc lists changed
+			by hand are not noticed.
+		"""
+		if self._csr is not None and self._csr_at == _arc_changes:
+			return self._csr
+
+		vertices	= list(self.vertices.values())
+		rows		= { id(v): i for i, v in enumerate(vertices) }
+		arcs		= [a for v in vertices for a in v.arcs]
+
+		indptr		= np.zeros(len(vertices) + 1, dtype=np.int32)
+		np.cumsum(np.fromiter((len(v.arcs) for v in vertices), dtype=np.int32, count=len(vertices)), out=indptr[1:])
+		indices		= np.fromiter((rows.get(id(a.end), -1) for a in arcs), dtype=np.int32, count=len(arcs))
+		weights		= np.fromiter((a.weight or 0.0 for a in arcs), dtype=np.float32, count=len(arcs))
+
+		for array in (indptr, indices, weights):
+			array.flags.writeable = False
+
+		self._csr		= (vertices, indptr, indices, weights)
+		self._csr_rows	= rows
+		self._csr_at	= _arc_changes
+		return self._csr
 
 	def connected(self, a, b):
 		v = self.vertices.get(a, None)
@@ -403,10 +579,7 @@ class MetaGraph:
 
 	def get_vertex(self, id):
 		if isinstance(id, int):
-			for v in self.vertices.values():
-				if v.id == id:
-					return v
-			return None
+			return self._by_id.get(id, None)
 		
 		return self.vertices.get(id, None)
 	
@@ -431,11 +604,5 @@ class MetaGraph:
 	
 	@property
 	def num_arcs(self):
-		count = 0
-		for v in self.vertices.values():
-			count += v.num_arcs
-			
-		return count
-
-if __name__ == '__main__':
-	test = MetaGraph( "graph" )
+		# Counted from the arc lists, so changes made through Vertex methods are included
+		return sum(len(v.arcs) for v in self.vertices.values())
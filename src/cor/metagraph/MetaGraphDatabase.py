@@ -41,6 +41,37 @@ class MetaGraphDatabase(GraphDatabase.GraphDatabase):
 	def create_arc(self, rec, arc_id):
 		return Arc( rec, arc_id )
 
+	def get_subgraph(self, root_id, depth):
+		""" Returns the vertices reachable from a root within depth hops together with
+			their outgoing arcs, as rows of
+			(vertex id, name, value, guid, arc id, name, weight, guid, end, anchor).
+			Arc ends and anchors are both followed. Rows are ordered by hop distance and
+			vertices without outgoing arcs have None arc fields.
+		"""
+		t	= { 'graph': self.id, 'root': root_id, 'depth': depth }
+		c	= self.conn.connect().cursor()
+
+		# Each recursive step joins arcs on their start vertex, so only the arcs of vertices
+		# already reached are read (through idx_arcs_start) instead of the whole graph
+		c.execute('''
+			WITH RECURSIVE
+			reach(id, depth) AS (
+				SELECT :root, 0
+				UNION
+				SELECT a.end, r.depth+1 FROM reach r JOIN arcs a ON a.start=r.id
+				WHERE r.depth<:depth AND a.graph_id=:graph
+				UNION
+				SELECT a.anchor, r.depth+1 FROM reach r JOIN arcs a ON a.start=r.id
+				WHERE r.depth<:depth AND a.graph_id=:graph AND a.anchor<>0 )
+			SELECT v.id, v.name, v.value, v.guid, a.id, a.name, a.weight, a.guid, a.end, a.anchor
+			FROM (SELECT id, MIN(depth) AS depth FROM reach GROUP BY id) r
+			JOIN vertices v ON v.id=r.id
+			LEFT JOIN arcs a ON a.start=v.id AND a.graph_id=:graph
+			ORDER BY r.depth, v.id, a.id''', t)
+		rows	= c.fetchall()
+		c.close()
+		return rows
+
 		
 if __name__ == '__main__':
 	test = MetaGraphDatabase( "graph.s3db", 14 )
@@ -45,6 +45,62 @@ def plural(noun):
 			return result
 
 
+class BatchConnection(sqlite3.Connection):
+	def __init__(self, *args, **kwargs):
+		""" SQLite connection which defers commits while a batch is open
+		Arguments
+			args -- Arguments passed to sqlite3.Connection
+		"""
+		sqlite3.Connection.__init__(self, *args, **kwargs)
+		self.batch			= 0
+		self.rollback_only	= False		# Set once any nested batch asks for a rollback
+		return
+
+	def begin(self):
+		""" Opens a batch. Nested batches are merged into the outermost one
+		"""
+		if self.batch == 0:
+			if self.in_transaction:
+				sqlite3.Connection.commit(self)
+
+			self.execute('BEGIN IMMEDIATE')
+
+		self.batch	+= 1
+		return self.batch
+
+	def end(self, commit=True):
+		""" Closes a batch and commits or rolls back once the outermost batch ends.
+			Nested batches share one transaction, so a rollback of any of them makes the
+			outermost batch roll back as well
+		Arguments
+			commit=True -- Whether to commit or roll back the batch
+		"""
+		if self.batch == 0:
+			return 0
+
+		if not commit:
+			self.rollback_only	= True
+
+		self.batch	-= 1
+		if self.batch == 0:
+			if self.rollback_only:
+				self.rollback()
+			else:
+				sqlite3.Connection.commit(self)
+
+			self.rollback_only	= False
+
+		return self.batch
+
+	def commit(self):
+		""" Commits the current transaction unless a batch is open
+		"""
+		if self.batch > 0:
+			return
+
+		sqlite3.Connection.commit(self)
+
+
 class ActiveRecord:
 	def __init__(self, model, conn, table=None):
 		""" Constructor
@@ -78,7 +134,7 @@ class ActiveRecord:
 			model -- Name of the model
 			path -- Path to the file
 		"""
-		return ActiveRecord( model, sqlite3.connect(path), table )
+		return ActiveRecord( model, ActiveRecord.connect(path), table )
 
 	@staticmethod
 	def connect(path):
@@ -86,7 +142,7 @@ class ActiveRecord:
 		Arguments
 			path -- Path to the database file
 		"""
-		return sqlite3.connect(path)
+		return sqlite3.connect(path, factory=BatchConnection)
 
 	@staticmethod
 	def tables(conn):
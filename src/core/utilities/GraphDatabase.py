@@ -11,13 +11,26 @@ from datetime import datetime
 class GraphDatabaseConnection:
 	def __init__(self, path):
 		self.path		= path
+		self.db			= None
 		return
 
 	def create(self, table:str):
-		return ActiveRecord.create('', self.path, table)
+		return ActiveRecord('', self.connect(), table)
 	
 	def connect(self):
-		return ActiveRecord.connect( self.path )
+		# All tables share one connection so that writes can be batched
+		if self.db is None:
+			self.db = ActiveRecord.connect( self.path )
+		return self.db
+
+	def begin_batch(self):
+		return self.connect().begin()
+
+	def commit_batch(self):
+		return self.connect().end(True)
+
+	def rollback_batch(self):
+		return self.connect().end(False)
 
 class Arc(MultiTableActiveObject):
 	def __init__(self, rec, arc_id):
@@ -1,18 +1,78 @@
 """Semantic Role Labeling extraction for knowledge graph construction."""
 
-from typing import Dict, List, Optional, Set, Tuple
+from collections import OrderedDict, defaultdict, deque
+from functools import lru_cache
+from itertools import chain
+from operator import attrgetter
+import logging
+import os
+import warnings
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
 import spacy
+from spacy.strings import StringStore
+
+
+# Default number of texts per nlp.pipe batch and of parsing processes (-1 for all CPUs),
+# overridable from the environment
+DEFAULT_BATCH_SIZE = int(os.environ.get("SRL_SPACY_BATCH_SIZE", "64"))
+DEFAULT_N_PROCESS = int(os.environ.get("SRL_SPACY_N_PROCESS", "1"))
+
+
+def _label_ids(*labels: str) -> Tuple[int, ...]:
+    """Return the ids spaCy stores in token.dep / token.pos for the given labels."""
+    strings = StringStore()
+    return tuple(strings.add(label) for label in labels)
+
+
+# Compared against token.dep / token.pos, so the extraction loops test ints instead of
+# decoding dep_ / pos_ into new strings for every token
+(_DEP_ROOT, _DEP_RELCL, _DEP_APPOS, _DEP_POSS, _DEP_NUMMOD, _DEP_AMOD,
+ _DEP_PREP, _DEP_POBJ, _DEP_ACOMP) = _label_ids(
+    "ROOT", "relcl", "appos", "poss", "nummod", "amod", "prep", "pobj", "acomp")
+_NOUN_MODIFIER_DEPS = frozenset(_label_ids("nmod", "compound"))
+_PREP_OBJECT_DEPS = frozenset(_label_ids("pobj", "dative"))
+
+_POS_VERB, _POS_ADJ = _label_ids("VERB", "ADJ")
+_CLAUSE_VERB_POS = frozenset(_label_ids("VERB", "AUX"))
+_NOUN_POS = frozenset(_label_ids("NOUN", "PROPN"))
+_POSSESSIVE_POS = frozenset(_label_ids("PRON", "DET"))
+
+_TOKEN_INDEX = attrgetter("i")
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=4)
+def _load_nlp(model_name: str, enable_ner: bool = False, use_gpu: bool = False):
+    """Load a spaCy model once per process.
+
+    Args:
+        model_name: spaCy model name to load
+        enable_ner: Whether to keep the named entity recognizer
+        use_gpu: Whether to place the model on the GPU when one is available
+
+    Returns:
+        Loaded spaCy language model, shared by all callers with the same arguments
+    """
+    # The GPU has to be activated before the model is loaded
+    if use_gpu and not spacy.prefer_gpu():
+        warnings.warn("GPU requested but not available, parsing on the CPU")
+
+    # Extraction reads the dep, pos and lemma of each token, so the tagger, parser, attribute_ruler
+    # (which maps tags to pos) and lemmatizer must stay; only NER can be dropped. The parser
+    # already sets sentence boundaries, so the (disabled by default) senter is not even loaded.
+    return spacy.load(model_name, exclude=["senter"] if enable_ner else ["ner", "senter"])
 
 
 class SRLExtractor:
     """Extracts semantic roles from sentences using spaCy."""
 
     # Verb categories for primitive extraction
-    DENOTATION_VERBS = {
+    DENOTATION_VERBS = frozenset({
         "am", "are", "is", "was", "were", "be", "being", "been"
-    }
+    })
 
-    ATTRIBUTION_VERBS = {
+    ATTRIBUTION_VERBS = frozenset({
         "have", "has", "had", "own", "owns", "owned",
         "possess", "possesses", "possessed",
         "contain", "contains", "contained",
@@ -24,125 +84,172 @@ class SRLExtractor:
         "get", "gets", "got",
         "carry", "carries", "carried",
         "hold", "holds", "held"
-    }
+    })
 
-    ATTRIBUTION_VERBS_INVERSE = {
+    ATTRIBUTION_VERBS_INVERSE = frozenset({
         "belong", "belongs", "belonged",
         "relate", "relates", "related",
         "associate", "associates", "associated"
-        }
+        })
     
-    INVERSE_PREPS = {"in", "at", "from", "of", "on", "under", "above", "below", "near"} # these will be used to create HAS_INVERSE anchors
+    INVERSE_PREPS = frozenset({"in", "at", "from", "of", "on", "under", "above", "below", "near"}) # these will be used to create HAS_INVERSE anchors
+
+    REL_PRONOUNS = frozenset({"that", "which", "who", "whom", "whose"})
+
+    CORE_PREPS = frozenset({"to", "for", "with", "onto", "into"})  # prepositions that often mark objects
+
+    SUBJECT_DEPS: FrozenSet[str] = frozenset({"nsubj", "nsubjpass", "csubj"})
+    OBJECT_DEPS: FrozenSet[str] = frozenset({"obj", "dobj", "attr", "oprd"})
+
+    # Possessive determiners and the subject pronoun they stand for
+    POSSESSIVE_SUBJECTS = {
+        "my": "i",
+        "your": "you",
+        "his": "he",
+        "her": "she",
+        "its": "it",
+        "our": "we",
+        "their": "they"
+    }
 
-    REL_PRONOUNS = {"that", "which", "who", "whom", "whose"}
+    def __init__(self, model_name: str = "en_core_web_sm", enable_ner: bool = False,
+                 cache_size: int = 10_000, use_gpu: bool = False):
+        """Initialize SRL extractor with spaCy model.
 
-    CORE_PREPS = {"to", "for", "with", "onto", "into"}  # prepositions that often mark objects
+        Args:
+            model_name: spaCy model name to use
+            enable_ner: Whether to keep the named entity recognizer. Extraction
+                itself does not use entities, so it is excluded by default.
+            cache_size: Number of sentences whose results are kept, so repeated
+                sentences are not parsed again. 0 disables the cache.
+            use_gpu: Whether to run the model on the GPU. This pays off for large
+                batches and transformer models such as en_core_web_trf.
+        """
+        self.nlp = _load_nlp(model_name, enable_ner, use_gpu)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, List[Dict]]" = OrderedDict()
+
+        # Surrogates of the lowercase category verbs, later categories take precedence
+        self._verb_surrogates: Dict[str, str] = {}
+        for surrogate, verbs in (("HAS_INVERSE", self.ATTRIBUTION_VERBS_INVERSE),
+                                 ("HAS", self.ATTRIBUTION_VERBS),
+                                 ("IS", self.DENOTATION_VERBS | {"be"})):
+            for v in verbs:
+                self._verb_surrogates[v.lower()] = surrogate
+
+        # Same surrogates keyed by StringStore id, so lemmas can be matched without decoding lemma_
+        strings = self.nlp.vocab.strings
+        self._verb_surrogate_ids: Dict[int, str] = {
+            strings.add(v): surrogate for v, surrogate in self._verb_surrogates.items()
+        }
 
-    SUBJECT_DEPS: Set[str] = {"nsubj", "nsubjpass", "csubj"}
-    OBJECT_DEPS: Set[str] = {"obj", "dobj", "attr", "oprd"} 
+        self._subject_dep_ids = frozenset(_label_ids(*self.SUBJECT_DEPS))
+        self._object_dep_ids = frozenset(_label_ids(*self.OBJECT_DEPS))
+        # Labels _get_objects looks at: direct objects, prepositional objects and complements
+        self._object_candidate_dep_ids = self._object_dep_ids | {_DEP_POBJ, _DEP_ACOMP}
 
-    def __init__(self, model_name: str = "en_core_web_sm"):
-        """Initialize SRL extractor with spaCy model."""
-        self.nlp = spacy.load(model_name)
+        # Word lists as ids of their lowercase forms, compared against token.lower
+        self._rel_pronoun_ids = frozenset(strings.add(w) for w in self.REL_PRONOUNS)
+        self._core_prep_ids = frozenset(strings.add(w) for w in self.CORE_PREPS)
     
     def _split_into_clauses(self, sent):
         """
         Split into:
           - main clause tokens (sentence minus any relcl subtrees)
           - each relative clause as a contiguous span (relcl verb subtree)
-        Returns a list where the first item is a LIST of tokens (main clause),
-        and the rest are spaCy spans (relative clauses).
+        Returns a list of (clause, relcl verb) pairs. The first clause is the main
+        clause with relcl verb None: the sentence span itself when it has no
+        relative clause, else a LIST of tokens. The rest are spaCy spans
+        (relative clauses) with the relcl verb that heads them.
         """
         # 1) Collect relative clauses (spans) and all their token indices
-        relcl_spans = []
+        relcl_clauses = []
         relcl_token_ids = set()
 
         for t in sent:
-            if t.dep_ == "relcl" and t.pos_ in {"VERB", "AUX"}:
-                toks = list(t.subtree)
-                start = toks[0].i
-                end = toks[-1].i + 1
+            if t.dep == _DEP_RELCL and t.pos in _CLAUSE_VERB_POS:
+                # The parser keeps the subtree bounds, no need to walk the subtree
+                start = t.left_edge.i
+                end = t.right_edge.i + 1
                 span = sent.doc[start:end]
-                relcl_spans.append(span)
-                relcl_token_ids.update(tok.i for tok in toks)
+                relcl_clauses.append((span, t))
+                relcl_token_ids.update(range(start, end))
 
         # 2) Main clause = sentence tokens excluding relcl tokens
-        main_clause_tokens = [tok for tok in sent if tok.i not in relcl_token_ids]
+        if relcl_token_ids:
+            main_clause_tokens = [tok for tok in sent if tok.i not in relcl_token_ids]
+        else:
+            main_clause_tokens = sent
 
         # Sort relcls left-to-right
-        relcl_spans.sort(key=lambda sp: sp.start)
+        relcl_clauses.sort(key=lambda clause: clause[0].start)
 
         # main clause first, then relcls
-        return [main_clause_tokens] + relcl_spans
+        return [(main_clause_tokens, None)] + relcl_clauses
     
 
-    def _resolve_relative_pronoun(self, tokens, arg):
+    def _index_clause(self, tokens):
         """
-        Generic resolver for relative pronouns inside a relative clause.
-
-        If `arg` is a relative pronoun (that/which/who/whom/whose) AND the given
-        token sequence contains a relcl verb, resolve it to the antecedent noun
-        (relcl_verb.head). Otherwise return `arg` unchanged.
+        Walk a clause once, bucketing its tokens by dependency label.
 
         Args:
-            tokens: iterable of spaCy Tokens (list[Token] or Span)
-            arg: str | None
+            tokens: iterable of spaCy Tokens (list[Token] or Span), in clause order
 
         Returns:
-            str | None
+            Tuple of (main verb token or None, dict mapping dep id -> tokens in clause order)
         """
-        if not arg:
-            return arg
-
-        if arg.text.lower() not in self.REL_PRONOUNS:
-            return arg
+        main_verb_token = None
+        by_dep = {}
 
-        relcl_verb = None
         for t in tokens:
-            if t.dep_ == "relcl" and t.pos_ in {"VERB", "AUX"}:
-                relcl_verb = t
-                break
+            dep = t.dep
+            if main_verb_token is None and (t.pos == _POS_VERB or dep == _DEP_ROOT):
+                main_verb_token = t
 
-        if not relcl_verb:
-            return arg  # not a relative clause context
+            bucket = by_dep.get(dep)
+            if bucket is None:
+                by_dep[dep] = [t]
+            else:
+                bucket.append(t)
 
-        return relcl_verb.head
+        return main_verb_token, by_dep
 
-    def _get_relcl_antecedent(self, tokens):
-        """If tokens belong to a relcl clause, return the antecedent noun; else None."""
-        for t in tokens:
-            if t.dep_ == "relcl" and t.pos_ in {"VERB", "AUX"}:
-                return t.head
-        return None
+    @staticmethod
+    def _select(by_dep, deps):
+        """Return the tokens of an indexed clause with any of the given dep ids, in clause order."""
+        buckets = [by_dep[dep] for dep in deps if dep in by_dep]
+        if len(buckets) == 1:
+            return buckets[0]
+        return sorted(chain.from_iterable(buckets), key=_TOKEN_INDEX)
 
-    def _get_verb(self, sent):
+    def _resolve_relative_pronoun(self, antecedent, arg):
         """
-        Return the main verb's lemma (root form), ignoring auxiliaries.
-        """
-        for token in sent:
-            if token.pos_ == "VERB" or (token.dep_ == "ROOT" and token.dep_ != "aux"):
-                return token.lemma_
-        return None
+        Generic resolver for relative pronouns inside a relative clause.
 
+        If `arg` is a relative pronoun (that/which/who/whom/whose) AND the clause
+        is a relative clause, resolve it to the antecedent noun (relcl_verb.head).
+        Otherwise return `arg` unchanged.
 
-    def _get_subjects(self, sent):
-        subs = []
+        Args:
+            antecedent: antecedent token of the relative clause, None for a main clause
+            arg: Token | None
 
-        for token in sent:
-            if token.dep_ in self.SUBJECT_DEPS:
-                subs.append(token)
-                subs.extend(list(token.conjuncts))  # gets "Bob" in "Alice and Bob"
+        Returns:
+            Token | None
+        """
+        if not arg:
+            return arg
 
-                # dedupe + keep order
-                seen = set()
-                out = []
-                for t in subs:
-                    if t.i in seen:
-                        continue
-                    seen.add(t.i)
-                    out.append(t)
+        if antecedent is None or arg.lower not in self._rel_pronoun_ids:
+            return arg
 
-                return out
+        return antecedent
+
+    def _get_subjects(self, sent):
+        for token in sent:
+            if token.dep in self._subject_dep_ids:
+                # first subject and its conjuncts ("Bob" in "Alice and Bob"), deduped in order
+                return list({t.i: t for t in (token, *token.conjuncts)}.values())
 
         return []
 
@@ -158,49 +265,52 @@ class SRLExtractor:
         appositives = {}
 
         for token in sent:
-            if token.dep_ == "appos":
+            if token.dep == _DEP_APPOS:
                 head = token.head
-                appositives.setdefault(head, []).append(token)
+                group = appositives.setdefault(head, [])
+                group.append(token)
 
                 # Handle coordinated appositives: "my friends, Alice and Bob"
-                for conj in token.conjuncts:
-                    appositives[head].append(conj)
+                group.extend(token.conjuncts)
 
         return appositives
 
 
-    def _get_objects(self, sent):
-        antecedent = self._get_relcl_antecedent(sent)  # None if not a relcl clause
-        main_verb_token = None
-
-        # find main verb
-        for t in sent:
-            if t.pos_ == "VERB" or (t.dep_ == "ROOT" and t.dep_ != "aux"):
-                main_verb_token = t
-                break
+    def _get_objects(self, sent, main_verb_token, antecedent):
+        """
+        Return the objects of a clause, with relative pronouns replaced by the antecedent.
 
+        Args:
+            sent: iterable of tokens (clause)
+            main_verb_token: main verb of the clause, as _index_clause finds it
+            antecedent: antecedent noun if the clause is a relcl clause, else None
+        """
         objs = []
 
         for token in sent:
+            # Read the label id once
+            dep = token.dep
+
             # Direct objects
-            if token.dep_ in self.OBJECT_DEPS:
+            if dep in self._object_dep_ids:
                 objs.append(token)
 
                 # handle conjunctions
-                objs.extend(list(token.conjuncts))
+                objs.extend(token.conjuncts)
 
                 # nmod/compound nouns
                 for child in token.children:
-                    if child.dep_ in {"nmod", "compound"} and child.pos_ in {"NOUN", "PROPN"}:
+                    if child.dep in _NOUN_MODIFIER_DEPS and child.pos in _NOUN_POS:
                         objs.append(child)
 
             # Prepositional objects attached to the main verb with core preps
-            if token.dep_ == "pobj" and token.head.dep_ == "prep" and token.head.head == main_verb_token:
-                if token.head.text.lower() in self.CORE_PREPS:
+            elif dep == _DEP_POBJ:
+                prep = token.head
+                if prep.dep == _DEP_PREP and prep.head == main_verb_token and prep.lower in self._core_prep_ids:
                     objs.append(token)
             
             # Adjectival complements (copular constructions)
-            if token.dep_ == "acomp" and token.head == main_verb_token:
+            elif dep == _DEP_ACOMP and token.head == main_verb_token:
                 objs.append(token)
 
         # dedupe, keep order + filter relative pronouns
@@ -211,7 +321,7 @@ class SRLExtractor:
                 continue
             seen.add(t.i)
 
-            if t.text.lower() in self.REL_PRONOUNS:
+            if t.lower in self._rel_pronoun_ids:
                 if antecedent:
                     out.append(antecedent)
                 continue
@@ -232,35 +342,27 @@ class SRLExtractor:
             Dict[str, List[str]] mapping noun -> adjectives
             e.g. {"equipment": ["advanced"], "instruments": ["specialized"]}
         """
-        heads_set = set(heads) if heads is not None else None
-        attrs = {}
+        # frozenset() hands back a frozenset argument as is, without copying it
+        heads_set = frozenset(heads) if heads is not None else None
+        attrs = defaultdict(list)
 
         for token in sent:
             # Noun-modifying adjectives
-            if token.pos_ == "ADJ" and token.dep_ == "amod":
+            if token.dep == _DEP_AMOD and token.pos == _POS_ADJ:
                 head = token.head
                 if heads_set is not None and head not in heads_set:
                     continue
 
-                attrs.setdefault(head, []).append(token)
+                adjs = attrs[head]
+                adjs.append(token)
 
                 # grab coordinated adjectives: "new and brilliant researcher"
                 for conj in token.conjuncts:
-                    if conj.pos_ == "ADJ":
-                        attrs[head].append(conj)
+                    if conj.pos == _POS_ADJ:
+                        adjs.append(conj)
 
         # dedupe while preserving order
-        for head, adjs in attrs.items():
-            seen = set()
-            deduped = []
-            for a in adjs:
-                if a in seen:
-                    continue
-                seen.add(a)
-                deduped.append(a)
-            attrs[head] = deduped
-
-        return attrs
+        return {head: list(dict.fromkeys(adjs)) for head, adjs in attrs.items()}
 
     def _get_quantifiers(self, sent, heads):
         """
@@ -274,13 +376,15 @@ class SRLExtractor:
             Dict[str, List[str]] mapping head noun -> list of quantities
             e.g. {"microscopes": ["three"]}
         """
-        quantifiers = {}
+        quantifiers = defaultdict(list)
 
         for token in sent:
-            if token.dep_ == "nummod" and token.head in heads:
-                quantifiers.setdefault(token.head, []).append(token)
+            if token.dep == _DEP_NUMMOD:
+                head = token.head
+                if head in heads:
+                    quantifiers[head].append(token)
 
-        return quantifiers
+        return dict(quantifiers)
 
     def _get_possessives(self, sent):
         """
@@ -294,7 +398,7 @@ class SRLExtractor:
 
         for token in sent:
             # Check for possessive determiners (her, his, their, my, your, our, its)
-            if token.dep_ == "poss" and token.pos_ in {"PRON", "DET"}:
+            if token.dep == _DEP_POSS and token.pos in _POSSESSIVE_POS:
                 head = token.head
                 possessives[head] = token
 
@@ -306,10 +410,10 @@ class SRLExtractor:
         pairs = []
     
         for token in sent:
-            if token.dep_ == "prep":
+            if token.dep == _DEP_PREP:
                 pobj = None
                 for child in token.children:
-                    if child.dep_ in {"pobj", "dative"}:
+                    if child.dep in _PREP_OBJECT_DEPS:
                         pobj = child
                         break
                 if pobj and pobj not in objects:
@@ -339,28 +443,30 @@ class SRLExtractor:
         attributes = attributes or {}
         prep_pobj_pairs = prep_pobj_pairs or []
         inverse_relations = []
+        object_set = frozenset(objects)  # set lookups instead of scanning the list per head
 
         # 1) Define attributes and quantifiers as anchor for objects
         for head, quants in quantifiers.items():
-            if head in objects:
+            if head in object_set:
                 for quant in quants:
                     anchors.append({head.text: quant.text})
 
         for head, adjs in attributes.items():
-            if head in objects:
+            if head in object_set:
                 for adj in adjs:
                     anchors.append({head.text: adj.text})
         
-        # 2) Anchors from prepositional object pairs
+        # 2) Anchors from prepositional object pairs, skipping pobjs that already are objects
+        object_texts = frozenset(o.text if not isinstance(o, str) else o for o in objects)
+        pairs = [(prep, pobj, prep.lower_) for prep, pobj in prep_pobj_pairs if pobj.text not in object_texts]
         for obj in objects:
-            for prep, pobj in prep_pobj_pairs:
-                if pobj not in [o.text if not isinstance(o, str) else o for o in objects]:
-                    # Check if this preposition indicates an inverse relationship
-                    if prep.text.lower() in self.INVERSE_PREPS:
-                        inverse_relations.append((prep.text.lower(), pobj.text.lower(), obj.text.lower()))
-                    else:
-                        # Keep as anchor for non-inverse preps
-                        anchors.append({obj.text: f"{prep.text} {pobj.text}"})
+            for prep, pobj, prep_lower in pairs:
+                # Check if this preposition indicates an inverse relationship
+                if prep_lower in self.INVERSE_PREPS:
+                    inverse_relations.append((prep_lower, pobj.lower_, obj.lower_))
+                else:
+                    # Keep as anchor for non-inverse preps
+                    anchors.append({obj.text: f"{prep.text} {pobj.text}"})
 
         return anchors, inverse_relations
 
@@ -371,34 +477,179 @@ class SRLExtractor:
             sentence: Input sentence to analyze
             
         Returns:
-            Dictionary containing subjects, verbs, objects, anchors, and indirect_objects
+            List of dictionaries (one per clause) containing subjects, verbs, objects,
+            anchors, inverse relations and possessive relations
         """
-        doc = self.nlp(sentence)
-        results = []
-                
+        results = self._cached(sentence)
+        if results is None:
+            results = self._extract_from_doc(self.nlp(sentence))
+            self._store(sentence, results)
+        return results
+
+    def extract_primitives_batch(self, sentences: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE,
+                                 n_process: int = DEFAULT_N_PROCESS):
+        """Extract primitives from many sentences, parsing them with nlp.pipe.
+
+        Args:
+            sentences: Input sentences to analyze
+            batch_size: Number of texts buffered per spaCy batch
+            n_process: Number of processes used for parsing (-1 for all CPUs)
+
+        Yields:
+            Result of extract_primitives for each sentence, in input order
+        """
+        if not self.cache_size:
+            for doc in self.nlp.pipe(sentences, batch_size=batch_size, n_process=n_process):
+                yield self._extract_from_doc(doc)
+            return
+
+        # Sentences in input order with their cached results, None for the ones sent to
+        # nlp.pipe. The pipe reads ahead, so cached results queued before a parsed
+        # sentence are released when its Doc comes back.
+        pending = deque()
+
+        def misses():
+            for sentence in sentences:
+                results = self._cached(sentence)
+                pending.append((sentence, results))
+                if results is None:
+                    yield sentence
+
+        for doc in self.nlp.pipe(misses(), batch_size=batch_size, n_process=n_process):
+            sentence, results = pending.popleft()
+            while results is not None:
+                yield results
+                sentence, results = pending.popleft()
+
+            results = self._extract_from_doc(doc)
+            self._store(sentence, results)
+            yield results
+
+        for _, results in pending:
+            yield results
+
+    def extract_batch(self, sentences: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE,
+                      n_process: int = DEFAULT_N_PROCESS) -> List[List[Dict]]:
+        """Extract primitives from many sentences at once.
+
+        Args:
+            sentences: Input sentences to analyze
+            batch_size: Number of texts buffered per spaCy batch
+            n_process: Number of processes used for parsing (-1 for all CPUs)
+
+        Returns:
+            List with the extract_primitives result of each sentence, in input order
+        """
+        return list(self.extract_primitives_batch(sentences, batch_size=batch_size, n_process=n_process))
+
+    def _cached(self, sentence: str) -> Optional[List[Dict]]:
+        """Return a copy of the cached results for a sentence, or None on a miss."""
+        results = self._cache.get(sentence)
+        if results is None:
+            return None
+
+        self._cache.move_to_end(sentence)
+        return self._copy_results(results)
+
+    def _store(self, sentence: str, results: List[Dict]) -> None:
+        """Cache a copy of the results for a sentence, evicting the least recently used."""
+        if not self.cache_size:
+            return
+
+        self._cache[sentence] = self._copy_results(results)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _copy_results(results: List[Dict]) -> List[Dict]:
+        """Copy extraction results so callers cannot modify the cached ones."""
+        return [{
+            "subjects": r["subjects"][:],
+            "verbs": r["verbs"],
+            "objects": r["objects"][:],
+            "anchors": [dict(a) for a in r["anchors"]],
+            "inverse_relations": r["inverse_relations"][:],
+            "possessive_relations": [dict(p) for p in r["possessive_relations"]]
+        } for r in results]
+
+    def iter_primitives(self, text: str) -> Iterator[Dict]:
+        """Extract primitives clause by clause, without building the whole result list.
+
+        Meant for long multi-sentence texts; results are not cached.
+
+        Args:
+            text: Input text to analyze
+
+        Yields:
+            One dictionary per clause, as in extract_primitives
+        """
+        yield from self._iter_from_doc(self.nlp(text))
+
+    def extract_primitives_from_doc(self, doc) -> List[Dict]:
+        """Extract primitives from a Doc the caller has already parsed.
+
+        Preferred over extract_primitives when one spaCy run is shared by several analyses,
+        since the text is not parsed again; results are not cached.
+
+        Args:
+            doc: spaCy Doc with dependency labels, lemmas and sentence boundaries
+
+        Returns:
+            List of dictionaries (one per clause), as in extract_primitives
+        """
+        return self._extract_from_doc(doc)
+
+    def extract_from_docs(self, docs: Iterable) -> List[List[Dict]]:
+        """Extract primitives from several already parsed Docs, e.g. the output of nlp.pipe.
+
+        Args:
+            docs: Iterable of spaCy Docs, as in extract_primitives_from_doc
+
+        Returns:
+            List of results, one per Doc, in input order
+        """
+        return [self._extract_from_doc(doc) for doc in docs]
+
+    def _extract_from_doc(self, doc):
+        """Extract primitives from an already parsed spaCy Doc."""
+        return list(self._iter_from_doc(doc))
+
+    def _iter_from_doc(self, doc):
+        """Yield the primitives of each clause of an already parsed spaCy Doc."""
         for sent in doc.sents:
             clauses = self._split_into_clauses(sent)
 
-            for clause in clauses:
-                # normalize clause to token iterable
-                tokens = clause if isinstance(clause, list) else list(clause)
+            for tokens, relcl_verb in clauses:
+                # tokens is a Span or a list of Tokens, both iterate in clause order
+                antecedent = relcl_verb.head if relcl_verb is not None else None  # None if not a relcl clause
+
+                # One pass over the clause; each helper below then only sees the
+                # tokens with the labels it looks for, still in clause order
+                main_verb_token, by_dep = self._index_clause(tokens)
 
-                verb = self._get_verb(tokens)
                 # Use verb surrogate for IS and HAS primtives
-                verb = self._get_verb_surrogate(verb)
-                objects = self._get_objects(tokens)
-                attrs = self._get_attributes(tokens, heads=objects)
-                quants = self._get_quantifiers(tokens, objects)
-                prep_pobj_pairs = self._get_prep_pobj_pairs(tokens)
-
-                # resolve rel-pronouns for objects/pobj
-                objects = [self._resolve_relative_pronoun(tokens, o) for o in objects]
+                verb = self._get_verb_surrogate(
+                    main_verb_token.lemma if main_verb_token is not None else 0,
+                    doc.vocab.strings
+                )
+                objects = self._get_objects(
+                    self._select(by_dep, self._object_candidate_dep_ids),
+                    main_verb_token,
+                    antecedent
+                )
+                object_set = frozenset(objects)  # hashed once for both lookups below
+                attrs = self._get_attributes(by_dep.get(_DEP_AMOD, ()), heads=object_set)
+                quants = self._get_quantifiers(by_dep.get(_DEP_NUMMOD, ()), object_set)
+                prep_pobj_pairs = self._get_prep_pobj_pairs(by_dep.get(_DEP_PREP, ()))
+
+                # _get_objects has already replaced relative pronouns among the objects
                 
-                # get *all* subjects (coordinated) and resolve
-                subjects = self._get_subjects(tokens)
-                subjects = [self._resolve_relative_pronoun(tokens, s) for s in subjects]
+                # get *all* subjects (coordinated) and resolve, only relcl clauses have pronouns to resolve
+                subjects = self._get_subjects(self._select(by_dep, self._subject_dep_ids))
+                if antecedent is not None:
+                    subjects = [self._resolve_relative_pronoun(antecedent, s) for s in subjects]
 
-                appositives = self._get_appositives(tokens) # To catch subjects such as "My friend, Sreekant ..."
+                appositives = self._get_appositives(by_dep.get(_DEP_APPOS, ())) # To catch subjects such as "My friend, Sreekant ..."
 
                 # Enrich subjects with their appositives
                 enriched_subjects = []
@@ -416,12 +667,12 @@ class SRLExtractor:
                     prep_pobj_pairs=prep_pobj_pairs
                 )
 
-                possessives = self._get_possessives(tokens) # To catch possessive relationships such as "her colleague ..."
+                possessives = self._get_possessives(by_dep.get(_DEP_POSS, ())) # To catch possessive relationships such as "her colleague ..."
 
                 # Extract possessive relationships and add to results
                 possessive_relations = []
                 for possessed_noun, possessor in possessives.items():
-                    possessor_text = self._resolve_possessive_to_subject(possessor.text.lower())
+                    possessor_text = self._resolve_possessive_to_subject(possessor.lower_)
 
                     # Get the full noun phrase including appositives
                     possessed_items = [possessed_noun]
@@ -432,11 +683,11 @@ class SRLExtractor:
                     for item in possessed_items:
                         possessive_relations.append({
                             "subject": possessor_text,
-                            "object": item.text.lower()
+                            "object": item.lower_
                         })
 
-                subjects = [s.text.lower() for s in subjects]
-                objects = [o.text.lower() for o in objects]
+                subjects = [s.lower_ for s in subjects]
+                objects = [o.lower_ for o in objects]
                 
                 result = {
                     "subjects": subjects,
@@ -446,54 +697,50 @@ class SRLExtractor:
                     "inverse_relations": inverse_relations,
                     "possessive_relations": possessive_relations
                 }
-                results.append(result)
-                
-                #print("-----")
-                #print("\nCLAUSE:", " ".join(t.text for t in tokens))
-                #print("-----")
-                #print("  SUBJECT:", subjects)
-                #print("  VERB:", verb)
-                #print("  OBJECT:", objects)
-                #print("  QUANTIFIERS:", quants)
-                #print("  ATTRIBUTES:", attrs)
-                #print("  PREP-POBJ PAIRS:", prep_pobj_pairs)
-                #print("  ANCHORS (for HAS):", anchors if verb == "HAS" else "N/A")
-                #print("  INVERSE RELATIONS (for HAS_INVERSE):", inverse_relations if verb == "HAS_INVERSE" else "N/A")
-                #print("  POSSESSIVE RELATIONS:", possessive_relations)
-                #print("-----")
-            #exit()
-        return results
 
+                # Only build the clause text when debug output is actually wanted
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "CLAUSE: %s | SUBJECT: %s | VERB: %s | OBJECT: %s | QUANTIFIERS: %s | "
+                        "ATTRIBUTES: %s | PREP-POBJ PAIRS: %s | ANCHORS: %s | "
+                        "INVERSE RELATIONS: %s | POSSESSIVE RELATIONS: %s",
+                        " ".join(t.text for t in tokens), subjects, verb, objects, quants,
+                        attrs, prep_pobj_pairs, anchors, inverse_relations, possessive_relations
+                    )
+
+                yield result
 
-    def _get_verb_surrogate(self, lemma: str) -> str:
+
+    def _get_verb_surrogate(self, lemma_id: int, strings: Optional[StringStore] = None) -> str:
         """Map verb lemma to primitive surrogate.
+        Args:
+            lemma_id: StringStore id of the verb lemma, 0 if there is none
+            strings: StringStore of the Doc the lemma comes from, defaults to this extractor's
+        Returns:
+            Primitive surrogate string
+        """
+        surrogate = self._verb_surrogate_ids.get(lemma_id)
+        if surrogate is not None:
+            return surrogate
+
+        # Lemmas that are not already lowercase category verbs
+        if strings is None:
+            strings = self.nlp.vocab.strings
+        return self._get_text_surrogate(strings[lemma_id] if lemma_id else "")
+
+    def _get_text_surrogate(self, lemma: str) -> str:
+        """Map verb lemma text to primitive surrogate.
         Args:
             lemma: Verb lemma
         Returns:
             Primitive surrogate string
         """
         lemma = (lemma or "").lower()
-        if lemma == "be" or lemma in self.DENOTATION_VERBS:
-            return "IS"
-        elif lemma in {v.lower() for v in self.ATTRIBUTION_VERBS}:
-            return "HAS"
-        elif lemma in {v.lower() for v in self.ATTRIBUTION_VERBS_INVERSE}:
-            return "HAS_INVERSE"
-        else:
-            return lemma
+        return self._verb_surrogates.get(lemma, lemma)
     
     def _resolve_possessive_to_subject(self, possessive: str) -> str:
         """Convert possessive pronouns to subject form."""
-        mapping = {
-            "my": "i",
-            "your": "you",
-            "his": "he",
-            "her": "she",
-            "its": "it",
-            "our": "we",
-            "their": "they"
-        }
-        return mapping.get(possessive, possessive)
+        return self.POSSESSIVE_SUBJECTS.get(possessive, possessive)
 
 
             
\ No newline at end of file
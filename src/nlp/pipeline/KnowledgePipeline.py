@@ -1,6 +1,7 @@
 """End-to-end pipeline for knowledge graph construction from text."""
 
-from typing import List, Dict, Any, Optional
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple, Union
 from tqdm import tqdm
 import spacy
 from spacy.lang.en.stop_words import STOP_WORDS
@@ -17,17 +18,23 @@ class KnowledgePipeline:
     
     def __init__(self, model_name: str = "en_core_web_sm",
                  enable_coref: bool = True,
-                 coref_strategy: str = 'replace'):
+                 coref_strategy: str = 'replace',
+                 use_gpu: bool = False):
         """Initialize the pipeline.
         
         Args:
             model_name: spaCy model name to use
             enable_coref: Whether to enable coreference resolution
             coref_strategy: 'filter' to remove pronouns, 'replace' to substitute, 'none' to disable
+            use_gpu: Whether to run the spaCy model on the GPU when one is available
         """
         self.cleaner = TextCleaner()
-        self.extractor = SRLExtractor(model_name)
+        # Coreference resolution tracks named entities, so only then keep NER
+        self.extractor = SRLExtractor(model_name, enable_ner=enable_coref, use_gpu=use_gpu)
         self.nlp = self.extractor.nlp
+        # Rule-based sentence splitting, so the full pipeline only runs once per sentence in the extractor
+        self.segmenter = spacy.blank(self.nlp.lang)
+        self.segmenter.add_pipe("sentencizer")
         self.enable_coref = enable_coref
         self.coref_strategy = coref_strategy
 
@@ -40,7 +47,8 @@ class KnowledgePipeline:
     def process_text(self, text: str, 
                      db_name: str,
                      template: Optional[str] = None,
-                     verbose: bool = True) -> Knowledge:
+                     verbose: bool = True,
+                     n_process: int = 1) -> Knowledge:
         """Process text and build knowledge graph.
         
         Args:
@@ -48,6 +56,7 @@ class KnowledgePipeline:
             db_name: Name/path for the knowledge database
             template: Optional database template path
             verbose: Whether to show progress bars
+            n_process: Number of processes spaCy uses for parsing sentences (-1 for all CPUs)
             
         Returns:
             Populated Knowledge database object
@@ -69,15 +78,14 @@ class KnowledgePipeline:
         # Step 2: Split into sentences
         if verbose:
             print("Processing sentences...")
-        doc = self.nlp(cleaned_text)
-        sentences = list(doc.sents)
+        doc = self.segmenter(cleaned_text)
+        sentences = [sent.text for sent in doc.sents]
         
         # Step 3: Extract SRL results
         srl_results = []
         iterator = tqdm(sentences, desc="Extracting SRL", unit="sentence") if verbose else sentences
         
-        for sent in iterator:
-            results = self.extractor.extract_primitives(sent.text)
+        for results in self.extractor.extract_primitives_batch(iterator, n_process=n_process):
             for result in results:
                 # Only add if result has meaningful content
                 if result['subjects'] or result['objects']:
@@ -90,18 +98,67 @@ class KnowledgePipeline:
         
         return kb
 
+    def process_stream(self, texts: Iterable[str],
+                       db_name: str,
+                       template: Optional[str] = None,
+                       verbose: bool = True,
+                       batch_size: int = 128,
+                       n_process: int = 1) -> Knowledge:
+        """Process a stream of text chunks (e.g. paragraphs) and build knowledge graph.
+        
+        Chunks are cleaned, split into sentences, parsed with nlp.pipe and saved one batch at a time, so the
+        full text never has to be held in memory. Coreference resolution runs per
+        chunk, so pronouns are only resolved against entities in the same chunk.
+        
+        Args:
+            texts: Iterable of raw text chunks
+            db_name: Name/path for the knowledge database
+            template: Optional database template path
+            verbose: Whether to show progress bars
+            batch_size: Number of chunks buffered per spaCy batch
+            n_process: Number of processes spaCy uses for splitting and parsing sentences (-1 for all CPUs)
+            
+        Returns:
+            Populated Knowledge database object
+        """
+        if verbose and self.enable_coref:
+            print(f"Coreference strategy: {self.coref_strategy}")
+
+        cleaned = (
+            self.cleaner.clean(
+                text,
+                coref_resolver=self.coref_resolver,
+                coref_strategy=self.coref_strategy
+            )
+            for text in texts
+        )
+        docs = self.segmenter.pipe(cleaned, batch_size=batch_size, n_process=n_process)
+        srl_results = self._iter_srl_results(docs, batch_size, n_process)
+
+        return self._save_to_database(srl_results, db_name, template, verbose)
+
+    def _iter_srl_results(self, docs: Iterable, batch_size: int, n_process: int = 1) -> Iterator[Dict[str, Any]]:
+        """Yield the meaningful SRL results of every sentence in the given docs."""
+        sentences = (sent.text for doc in docs for sent in doc.sents)
+        for results in self.extractor.extract_primitives_batch(sentences, batch_size=batch_size, n_process=n_process):
+            for result in results:
+                # Only add if result has meaningful content
+                if result['subjects'] or result['objects']:
+                    yield result
 
-    def _save_to_database(self, srl_results: List[Dict[str, List[str]]],
+    def _save_to_database(self, srl_results: Iterable[Dict[str, List[str]]],
                      db_name: str,
                      template: Optional[str],
-                     verbose: bool) -> Knowledge:
+                     verbose: bool,
+                     commit_every: int = 1000) -> Knowledge:
         """Save SRL results to knowledge database.
 
         Args:
-            srl_results: List of SRL extraction results
+            srl_results: SRL extraction results, a list or any iterable
             db_name: Database name/path
             template: Optional template path
             verbose: Whether to show progress
+            commit_every: Number of results written per transaction
 
         Returns:
             Populated Knowledge database
@@ -111,43 +168,49 @@ class KnowledgePipeline:
 
         iterator = tqdm(srl_results, desc="Saving to DB", unit="result") if verbose else srl_results
 
-        for result in iterator:
-            subjects = result['subjects']
-            verb = result['verbs']
-            objects = result['objects']
-            anchors = result.get('anchors', [])
-            inverse_relations = result.get('inverse_relations', [])
-            possessive_relations = result.get('possessive_relations', [])
-
-            for subject in subjects:
-                for obj in objects:
-                    if verb == "IS":
-                        say.IS(subject, obj)
-                    elif verb == "HAS":
-                        # Use corresponding anchor if available
-                        if len(anchors) >= 1:
-                            for anchor in anchors:
-                                for key, value in anchor.items():   # key=object, value=anchor attribute
-                                    say.HAS(subject, value, key)
-                        else:
-                            say.HAS(subject, "HAS", obj)
-                    elif verb == "HAS_INVERSE":
-                        # Use corresponding anchor if available
-                        if len(anchors) >= 1:
-                            for anchor in anchors:
-                                for key, value in anchor.items():   # key=object, value=anchor attribute
-                                    say.HAS(key, value, subject)
-                        else:
-                            say.HAS(obj, "HAS", subject)
+        # Results are parsed ahead commit_every at a time and each chunk is written in its own
+        # transaction, so the write lock is not held while the stream is parsed and a failure
+        # only loses the chunk being written
+        results = iter(iterator)
+        while chunk := list(islice(results, commit_every)):
+            with kb.batch():
+                for result in chunk:
+                    subjects = result['subjects']
+                    verb = result['verbs']
+                    objects = result['objects']
+                    anchors = result.get('anchors', [])
+                    inverse_relations = result.get('inverse_relations', [])
+                    possessive_relations = result.get('possessive_relations', [])
+
+                    for subject in subjects:
+                        for obj in objects:
+                            if verb == "IS":
+                                say.IS(subject, obj)
+                            elif verb == "HAS":
+                                # Use corresponding anchor if available
+                                if len(anchors) >= 1:
+                                    for anchor in anchors:
+                                        for key, value in anchor.items():   # key=object, value=anchor attribute
+                                            say.HAS(subject, value, key)
+                                else:
+                                    say.HAS(subject, "HAS", obj)
+                            elif verb == "HAS_INVERSE":
+                                # Use corresponding anchor if available
+                                if len(anchors) >= 1:
+                                    for anchor in anchors:
+                                        for key, value in anchor.items():   # key=object, value=anchor attribute
+                                            say.HAS(key, value, subject)
+                                else:
+                                    say.HAS(obj, "HAS", subject)
             
-            # Handle inverse relations from prepositions
-            for prep, pobj, obj in inverse_relations:
-                # boston -> HAS -> laboratory (for "laboratory in Boston")
-                say.HAS(pobj, prep, obj)
+                    # Handle inverse relations from prepositions
+                    for prep, pobj, obj in inverse_relations:
+                        # boston -> HAS -> laboratory (for "laboratory in Boston")
+                        say.HAS(pobj, prep, obj)
             
-            # Handle possessive relations
-            for poss_rel in possessive_relations:
-                say.HAS(poss_rel["subject"], "HAS", poss_rel["object"])
+                    # Handle possessive relations
+                    for poss_rel in possessive_relations:
+                        say.HAS(poss_rel["subject"], "HAS", poss_rel["object"])
         
         
                         ## Get or create vertices and assign values
@@ -182,16 +245,18 @@ class KnowledgePipeline:
                   db_name: str,
                   output_file: str, 
                   physics: bool = True,
-                  vertex_query: Optional[str] = None,
-                  arc_query: Optional[str] = None,) -> str:
+                  vertex_query: Optional[Union[str, Tuple[str, Sequence[Any]]]] = None,
+                  arc_query: Optional[Union[str, Tuple[str, Sequence[Any]]]] = None,) -> str:
         """Visualize knowledge graph from database.
         
         Args:
             db_name: Database name/path
             output_file: Output HTML filename
             physics: Whether to enable physics simulation
-            vertex_query: Optional SQL query to filter vertices
-            arc_query: Optional SQL query to filter arcs
+            vertex_query: Optional SQL query to filter vertices, either a string
+                or an (sql, parameters) tuple
+            arc_query: Optional SQL query to filter arcs, either a string
+                or an (sql, parameters) tuple
             
         Returns:
             Absolute path to saved visualization
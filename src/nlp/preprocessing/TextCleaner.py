@@ -1,5 +1,7 @@
 """Text preprocessing utilities for NLP pipeline."""
 
+from typing import Iterable, Iterator
+
 
 class TextCleaner:
     """Handles text cleaning and normalization operations."""
@@ -28,6 +30,26 @@ class TextCleaner:
         """
         return ' '.join(text.split())
     
+    @staticmethod
+    def iter_paragraphs(lines: Iterable[str]) -> Iterator[str]:
+        """Group lines into paragraphs separated by blank lines.
+        
+        Args:
+            lines: Input lines, e.g. an open text file
+            
+        Yields:
+            Each non-empty paragraph with its lines joined
+        """
+        paragraph = []
+        for line in lines:
+            if line.strip():
+                paragraph.append(line)
+            elif paragraph:
+                yield ''.join(paragraph)
+                paragraph = []
+        if paragraph:
+            yield ''.join(paragraph)
+    
     @classmethod
     def clean(cls, text: str, coref_resolver=None, coref_strategy: str = 'none', verbose: bool = False) -> str:
         """Apply all cleaning operations to text.
@@ -3,10 +3,13 @@
 import os
 import networkx as nx
 from pyvis.network import Network
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence, Tuple, Union
 
 from cor.knowledge.Knowledge import Knowledge
 
+# A query is either plain SQL or an (sql, parameters) pair
+Query = Union[str, Tuple[str, Sequence[Any]]]
+
 
 class GraphBuilder:
     """Builds and visualizes knowledge graphs."""
@@ -46,14 +49,16 @@ class GraphBuilder:
 
     @staticmethod
     def build_from_query(db_name: str, 
-                        vertex_query: Optional[str] = None,
-                        arc_query: Optional[str] = None) -> nx.DiGraph:
+                        vertex_query: Optional[Query] = None,
+                        arc_query: Optional[Query] = None) -> nx.DiGraph:
         """Build NetworkX graph from custom SQL queries.
         
         Args:
             db_name: Name/path of the knowledge database
-            vertex_query: SQL query for vertices (must return 'id' column)
-            arc_query: SQL query for arcs (must return 'id' column)
+            vertex_query: SQL query for vertices (must return 'id' column),
+                optionally as an (sql, parameters) tuple
+            arc_query: SQL query for arcs (must return 'id' column),
+                optionally as an (sql, parameters) tuple
             
         Returns:
             NetworkX directed graph
@@ -64,6 +69,13 @@ class GraphBuilder:
                 "my_kb.s3db",
                 vertex_query="SELECT id FROM vertices WHERE value = 1"
             )
+
+            # Bind values as parameters so SQLite can reuse the query plan
+            graph = GraphBuilder.build_from_query(
+                "my_kb.s3db",
+                vertex_query=("SELECT id FROM vertices WHERE name IN (?, ?)",
+                              ("victor", "elizabeth"))
+            )
         """
         G = nx.DiGraph()
         kb = Knowledge(db_name)
@@ -71,7 +83,7 @@ class GraphBuilder:
         
         # Get vertices from query
         if vertex_query:
-            cursor.execute(vertex_query)
+            GraphBuilder._execute(cursor, vertex_query)
             vertex_ids = [row[0] for row in cursor.fetchall()]
         else:
             vertex_ids = kb.graph.get_vertices()
@@ -88,7 +100,7 @@ class GraphBuilder:
         
         # Get arcs from query
         if arc_query:
-            cursor.execute(arc_query)
+            GraphBuilder._execute(cursor, arc_query)
             arc_ids = [row[0] for row in cursor.fetchall()]
         else:
             arc_ids = kb.graph.get_arcs()
@@ -106,6 +118,20 @@ class GraphBuilder:
         
         return G
 
+    @staticmethod
+    def _execute(cursor, query: Query) -> None:
+        """Execute a plain or parameterized query.
+        
+        Args:
+            cursor: SQLite cursor
+            query: SQL string or (sql, parameters) tuple
+        """
+        if isinstance(query, tuple):
+            sql, params = query
+            cursor.execute(sql, tuple(params))
+        else:
+            cursor.execute(query)
+
 
     @staticmethod
     def save_as_html(graph: nx.DiGraph, filename: str, 
@@ -35,5 +35,12 @@ class ConceptTestCase(unittest.TestCase):
 		with self.assertRaises(TypeError):
 			s.split(2)
 
+	def test_to_id(self):
+		id = Concept.to_id('victor')
+		self.assertEqual(id, Concept.to_id('victor'))
+		self.assertNotEqual(id, Concept.to_id('elizabeth'))
+		self.assertTrue(0 <= id < 2**32)
+		self.assertEqual(Concept('victor').id, id)
+
 if __name__ == '__main__':
     unittest.main()
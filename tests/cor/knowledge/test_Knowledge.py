@@ -3,7 +3,11 @@
 # Description: Test cases for the Knowledge class
 
 from cor.knowledge.Knowledge import Knowledge
+from cor.knowledge.Concept import HASH_VERSION, HASHES
 
+import hashlib
+import os
+import tempfile
 import unittest
 
 class KnowledgeTestCase(unittest.TestCase):
@@ -79,6 +83,43 @@ class KnowledgeTestCase(unittest.TestCase):
 		self.assertEqual(sreekant['name'], 'Sreekant')
 		self.assertEqual(melih['name'], 'Melih')
 
+	def test_batch(self):
+		say = self.kb.speak()
+		with self.kb.batch():
+			say.IS('Batch.Victor', 'Batch.creator')
+			say.IS('Batch.Elizabeth', 'Batch.creator')
+		self.assertIsNotNone(self.kb.graph.get_vertex_by_name('Batch.Victor', auto_add=False))
+		self.assertIn('Batch.Victor', say.nodes)
+
+		with self.assertRaises(RuntimeError):
+			with self.kb.batch():
+				say.IS('Batch.Justine', 'Batch.creator')
+				raise RuntimeError()
+		self.assertIsNone(self.kb.graph.get_vertex_by_name('Batch.Justine', auto_add=False))
+		self.assertNotIn('Batch.Justine', say.nodes)
+
+		# A rolled back inner batch takes the outer one with it
+		with self.kb.batch():
+			say.IS('Batch.Henry', 'Batch.creator')
+			with self.assertRaises(RuntimeError):
+				with self.kb.batch():
+					say.IS('Batch.Ernest', 'Batch.creator')
+					raise RuntimeError()
+		self.assertIsNone(self.kb.graph.get_vertex_by_name('Batch.Henry', auto_add=False))
+		self.assertIsNone(self.kb.graph.get_vertex_by_name('Batch.Ernest', auto_add=False))
+		self.assertNotIn('Batch.Henry', say.nodes)
+
+	def test_node_cache(self):
+		say = self.kb.speak()
+		say.cache_size = 2
+		for name in ['Cache.A', 'Cache.B', 'Cache.A', 'Cache.C']:
+			say.get_node(name)
+		self.assertEqual(list(say.nodes), ['Cache.A', 'Cache.C'])
+
+		say.forget('Cache.A')
+		self.assertEqual(list(say.nodes), ['Cache.C'])
+		self.assertEqual(say.get_node('Cache.A').id, self.kb.graph.get_vertex_by_name('Cache.A', auto_add=False).id)
+
 	def test_load(self):
 		c = self.kb.slice('Melih', depth=2)
 
@@ -86,7 +127,51 @@ class KnowledgeTestCase(unittest.TestCase):
 		print( c )
 		return
 
-	def test_load(self):
+	def test_slice(self):
+		say = self.kb.speak()
+		with self.kb.batch():
+			say.IS('Slice.Melih', 'Slice.man')
+			say.IS('Slice.man', 'Slice.male')
+			say.HAS('Slice.Melih', 'Slice.home', 'Slice.Melih.Home')
+			say.IS('Slice.Melih.Home', 'Slice.house')
+
+		c = self.kb.slice('Slice.Melih', depth=1)
+		self.assertEqual(c.root.name, 'Slice.Melih')
+		self.assertEqual(sorted(c.vertices), ['Slice.Melih', 'Slice.Melih.Home', 'Slice.home', 'Slice.man'])
+		self.assertTrue(c.connected('Slice.Melih', c.vertices['Slice.man']))
+
+		c = self.kb.slice('Slice.Melih', depth=2)
+		self.assertIn('Slice.male', c.vertices)
+		self.assertIn('Slice.house', c.vertices)
+
+	def test_hash_version(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			name	= os.path.join(tmp, 'kb')
+			kb		= Knowledge(name)
+			graphs	= kb.graph['graphs']
+			self.assertEqual(graphs.get(kb.graph.id, 'metadata'), f'hash={HASH_VERSION}')
+			self.assertEqual(kb.hash_version, HASH_VERSION)
+
+			# Graphs without a recorded version hold SHA-256 ids and are opened without a stamp
+			graphs.set(kb.graph.id, 'metadata', '')
+			legacy	= Knowledge(name)
+			self.assertEqual(legacy.hash_version, 0)
+			self.assertEqual(graphs.get(kb.graph.id, 'metadata'), '')
+			self.assertEqual(legacy['Legacy']['type'], int.from_bytes(hashlib.sha256(b'Legacy').digest()[:4], 'big'))
+			self.assertEqual(legacy.speak().get_node('Legacy.Node')['type'], HASHES[0]('Legacy.Node'))
+
+			# An explicit version must match the recorded one
+			with self.assertRaises(ValueError):
+				Knowledge(name, hash_version=1)
+			self.assertEqual(Knowledge(name, hash_version=0).hash_version, 0)
+
+			# New databases record the version they are asked for
+			blake	= Knowledge(os.path.join(tmp, 'blake'), hash_version=1)
+			self.assertEqual(blake.graph['graphs'].get(blake.graph.id, 'metadata'), 'hash=1')
+			self.assertEqual(blake['Legacy']['type'], HASHES[1]('Legacy'))
+		return
+
+	def test_get_all(self):
 		c = self.kb.get_all()
 		print( f'vertices = {len(c.vertices)}' )
 		print( c )
@@ -0,0 +1,106 @@
+#!/usr/bin/python
+# Filename: test_MetaGraph.py
+# Description: Test cases for the MetaGraph class
+
+from cor.metagraph.MetaGraph import MetaGraph, Vertex
+from core.utilities.Errors import ErrorCode
+
+import unittest
+
+def load(info):
+	graph = MetaGraph()
+	for i, k in enumerate(info.keys()):
+		graph.add( Vertex(i + 1, 1.0, k) )
+
+	for k, v in info.items():
+		for e in v:
+			graph.join( k, e )
+	return graph
+
+class MetaGraphTestCase(unittest.TestCase):
+	@classmethod
+	def setUpClass(self):
+		return
+		
+	@classmethod
+	def tearDownClass(self):
+		return
+		
+	def setUp(self):
+		self.graph	= load({
+			'A': ['B','C'],
+			'B': ['D','C'],
+			'C': ['D'],
+			'D': [],
+			})
+		return
+		
+	def tearDown(self):
+		return
+
+	def test_get_vertex(self):
+		b = self.graph.vertices['B']
+		self.assertIs(self.graph.get_vertex(b.id), b)
+		self.assertIs(self.graph.get_vertex('B'), b)
+
+		self.graph.remove(b)
+		self.assertIsNone(self.graph.get_vertex(b.id))
+		return
+
+	def test_csr(self):
+		vertices, indptr, indices, weights = self.graph.to_csr()
+		self.assertEqual([v.name for v in vertices], ['A', 'B', 'C', 'D'])
+		self.assertEqual(indptr.tolist(), [0, 2, 4, 5, 5])
+		self.assertEqual(indices.tolist(), [1, 2, 3, 2, 3])
+		self.assertEqual(len(weights), self.graph.num_arcs)
+
+		self.graph.join('D', 'A')
+		self.assertEqual(self.graph.to_csr()[1].tolist(), [0, 2, 4, 5, 6])
+		self.assertEqual(self.graph.num_arcs, 6)
+
+		self.assertTrue(self.graph.detach('D', self.graph.vertices['A']))
+		self.assertEqual(self.graph.num_arcs, 5)
+		self.graph.remove(self.graph.vertices['B'])
+		self.assertEqual(self.graph.num_arcs, sum(v.num_arcs for v in self.graph.vertices.values()))
+
+		# Arcs detached through the vertex itself are counted too and drop the cached arrays
+		self.assertEqual(len(self.graph.to_csr()[2]), 2)
+		self.assertTrue(self.graph.vertices['A'].detach(self.graph.vertices['C']))
+		self.assertEqual(self.graph.num_arcs, 1)
+		self.assertEqual(len(self.graph.to_csr()[2]), 1)
+		self.assertEqual([v.name for v in self.graph.reachable('A')], ['A'])
+		return
+
+	def test_traversal(self):
+		names	= []
+		def collect(node, ctxt, level):
+			names.append(node.name)
+			return ErrorCode.NOERROR
+
+		root	= self.graph.vertices['A']
+		root.dfs(collect, None)
+		self.assertEqual(names, ['A', 'B', 'D', 'C'])
+
+		names.clear()
+		root.bfs(collect, None)
+		self.assertEqual(names, ['A', 'B', 'C', 'D'])
+
+		names.clear()
+		root.bfs(collect, None, depth=2)
+		self.assertEqual(names, ['A', 'B', 'C'])
+
+		self.assertEqual([v.name for v in self.graph.reachable('A')], ['A', 'B', 'C', 'D'])
+		self.assertEqual([v.name for v in self.graph.reachable('A', dfs=True)], ['A', 'B', 'D', 'C'])
+		self.assertEqual([v.name for v in self.graph.reachable('A', depth=2)], ['A', 'B', 'C'])
+
+		# Deep chains must not hit the recursion limit
+		chain	= load({ f'N{i}': [f'N{i+1}'] if i < 4999 else [] for i in range(5000) })
+		names.clear()
+		chain.vertices['N0'].dfs(collect, None, depth=10000)
+		self.assertEqual(len(names), 5000)
+		self.assertEqual(len(chain.reachable('N0', depth=10000, dfs=True)), 5000)
+		return
+
+
+if __name__ == '__main__':
+    unittest.main()
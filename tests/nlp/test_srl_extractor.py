@@ -74,6 +74,25 @@ class TestSRLExtractor(unittest.TestCase):
         self.assertIn('Alice', results[1]['subjects'])
         self.assertIn('Bob', results[2]['subjects'])
     
+    def test_cached_results(self):
+        """Test that repeated sentences return equal, independent results."""
+        sentence = "Alice has a book."
+        first = self.extractor.extract_primitives(sentence)
+        first[0]['subjects'].append('changed')
+
+        again = self.extractor.extract_primitives(sentence)
+        self.assertNotIn('changed', again[0]['subjects'])
+        self.assertEqual(self.extractor.extract_batch([sentence, "The dog runs.", sentence])[2], again)
+
+    def test_extract_from_docs(self):
+        """Test that pre-parsed Docs give the same results as raw sentences."""
+        sentences = ["Alice has a book.", "The dog runs."]
+        docs = list(self.extractor.nlp.pipe(sentences))
+
+        self.assertEqual(self.extractor.extract_from_docs(docs), self.extractor.extract_batch(sentences))
+        self.assertEqual(self.extractor.extract_primitives_from_doc(docs[0]),
+                         self.extractor.extract_primitives(sentences[0]))
+    
     def test_empty_sentence(self):
         """Test extraction from empty sentence."""
         sentence = ""
@@ -45,6 +45,13 @@ class TestTextCleaner(unittest.TestCase):
         result = TextCleaner.clean(text)
         self.assertEqual(result, expected)
 
+    def test_iter_paragraphs(self):
+        """Test grouping lines into blank-line separated paragraphs."""
+        lines = ["\n", "First line\n", "second line\n", "\n", "   \n", "Second paragraph\n", "last"]
+        expected = ["First line\nsecond line\n", "Second paragraph\nlast"]
+        result = list(TextCleaner.iter_paragraphs(lines))
+        self.assertEqual(result, expected)
+
 
 if __name__ == '__main__':
     unittest.main()